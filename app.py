@@ -1,279 +1,506 @@
 # ============================================================================
 # IMPORT LIBRARIES
 # ============================================================================
+import bisect
+import functools
+import io
+import json
+from types import MappingProxyType
+
 import streamlit as st
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass, field
 from datetime import datetime
+from enum import IntFlag
 
 # ============================================================================
 # KONFIGURASI GLOBAL - MULTI-DOMAIN EXPERT SYSTEM
 # ============================================================================
+# Tabel konstan dibangun lewat factory @st.cache_resource: satu instance
+# shared antar session/page dan terlihat di cache stats Streamlit. Hasilnya
+# dibungkus MappingProxyType karena read-only.
+
 # --- Mechanical Vibration Limits (ISO 10816-3/7) ---
-ISO_LIMITS_VELOCITY = {
-    "Zone A (Good)": 2.8,
-    "Zone B (Acceptable)": 4.5,
-    "Zone C (Unacceptable)": 7.1,
-    "Zone D (Danger)": 11.0
-}
+@st.cache_resource(show_spinner=False)
+def _load_iso_limits():
+    return MappingProxyType({
+        "Zone A (Good)": 2.8,
+        "Zone B (Acceptable)": 4.5,
+        "Zone C (Unacceptable)": 7.1,
+        "Zone D (Danger)": 11.0
+    })
 
-ACCEL_BASELINE = {
-    "Band1 (0.5-1.5kHz)": 0.3,
-    "Band2 (1.5-5kHz)": 0.2,
-    "Band3 (5-16kHz)": 0.15
-}
+@st.cache_resource(show_spinner=False)
+def _load_accel_baseline():
+    return MappingProxyType({
+        "Band1 (0.5-1.5kHz)": 0.3,
+        "Band2 (1.5-5kHz)": 0.2,
+        "Band3 (5-16kHz)": 0.15
+    })
 
 # --- Bearing Temperature Thresholds (IEC 60034-1, API 610, SKF) ---
-BEARING_TEMP_LIMITS = {
-    "normal_max": 70,
-    "elevated_min": 70,
-    "elevated_max": 80,
-    "warning_min": 80,
-    "warning_max": 90,
-    "critical_min": 90,
-    "delta_threshold": 15,
-    "ambient_reference": 30
-}
+@st.cache_resource(show_spinner=False)
+def _load_bearing_temp_limits():
+    return MappingProxyType({
+        "normal_max": 70,
+        "elevated_min": 70,
+        "elevated_max": 80,
+        "warning_min": 80,
+        "warning_max": 90,
+        "critical_min": 90,
+        "delta_threshold": 15,
+        "ambient_reference": 30
+    })
+
+ISO_LIMITS_VELOCITY = _load_iso_limits()
+ACCEL_BASELINE = _load_accel_baseline()
+BEARING_TEMP_LIMITS = _load_bearing_temp_limits()
+# Bind threshold yang dipakai hot path sebagai konstanta modul sekali saja,
+# bukan lookup dict per panggilan.
+_DELTA_THRESHOLD = BEARING_TEMP_LIMITS["delta_threshold"]
+_CRITICAL_MIN = BEARING_TEMP_LIMITS["critical_min"]
+# Kuadrat threshold ΔT: perbandingan delta kuadrat menghindari panggilan
+# abs() di jalur per pompa.
+_DELTA_SQ = _DELTA_THRESHOLD * _DELTA_THRESHOLD
 
 # --- Hydraulic Fluid Properties (BBM Specific - Pertamina) ---
-FLUID_PROPERTIES = {
-    "Pertalite (RON 90)": {
-        "sg": 0.73,
-        "vapor_pressure_kpa_38C": 52,
-        "viscosity_cst_40C": 0.6,
-        "flash_point_C": -43,
-        "risk_level": "High"
-    },
-    "Pertamax (RON 92)": {
-        "sg": 0.74,
-        "vapor_pressure_kpa_38C": 42,
-        "viscosity_cst_40C": 0.6,
-        "flash_point_C": -43,
-        "risk_level": "High"
-    },
-    "Diesel / Solar": {
-        "sg": 0.84,
-        "vapor_pressure_kpa_38C": 0.5,
-        "viscosity_cst_40C": 3.0,
-        "flash_point_C": 52,
-        "risk_level": "Moderate"
-    }
-}
+# Read-only view: tabel ini dibaca di banyak tempat dan tidak boleh dimutasi.
+@st.cache_resource(show_spinner=False)
+def _load_fluid_properties():
+    return MappingProxyType({
+        "Pertalite (RON 90)": {
+            "sg": 0.73,
+            "vapor_pressure_kpa_38C": 52,
+            "viscosity_cst_40C": 0.6,
+            "flash_point_C": -43,
+            "risk_level": "High"
+        },
+        "Pertamax (RON 92)": {
+            "sg": 0.74,
+            "vapor_pressure_kpa_38C": 42,
+            "viscosity_cst_40C": 0.6,
+            "flash_point_C": -43,
+            "risk_level": "High"
+        },
+        "Diesel / Solar": {
+            "sg": 0.84,
+            "vapor_pressure_kpa_38C": 0.5,
+            "viscosity_cst_40C": 3.0,
+            "flash_point_C": 52,
+            "risk_level": "Moderate"
+        }
+    })
 
 # --- Electrical Thresholds (IEC 60034-1 & Practical Limits) ---
-ELECTRICAL_LIMITS = {
-    "voltage_unbalance_warning": 1.0,
-    "voltage_unbalance_critical": 2.0,
-    "current_unbalance_warning": 5.0,
-    "current_unbalance_critical": 8.0,
-    "voltage_tolerance_low": 90,
-    "voltage_tolerance_high": 110,
-    "current_load_warning": 90,
-    "current_load_critical": 100,
-    "service_factor": 1.0
-}
+@st.cache_resource(show_spinner=False)
+def _load_electrical_limits():
+    return MappingProxyType({
+        "voltage_unbalance_warning": 1.0,
+        "voltage_unbalance_critical": 2.0,
+        "current_unbalance_warning": 5.0,
+        "current_unbalance_critical": 8.0,
+        "voltage_tolerance_low": 90,
+        "voltage_tolerance_high": 110,
+        "current_load_warning": 90,
+        "current_load_critical": 100,
+        "service_factor": 1.0
+    })
+
+FLUID_PROPERTIES = _load_fluid_properties()
+ELECTRICAL_LIMITS = _load_electrical_limits()
+
+# Konstanta hot-path diagnosa electrical: di-bind sekali di module scope
+# supaya tiap call tidak membayar lookup dict + hash string.
+_VOLT_UNB_WARNING = ELECTRICAL_LIMITS["voltage_unbalance_warning"]
+_VOLT_UNB_CRITICAL = ELECTRICAL_LIMITS["voltage_unbalance_critical"]
+_CURR_UNB_WARNING = ELECTRICAL_LIMITS["current_unbalance_warning"]
+_CURR_UNB_CRITICAL = ELECTRICAL_LIMITS["current_unbalance_critical"]
+_LOAD_CRITICAL = ELECTRICAL_LIMITS["current_load_critical"]
+_VOLT_TOL_LOW = ELECTRICAL_LIMITS["voltage_tolerance_low"]
+_VOLT_TOL_HIGH = ELECTRICAL_LIMITS["voltage_tolerance_high"]
+
+# Konstanta UI yang dipakai ulang tiap rerun: daftar pilihan selectbox dan
+# ikon severity tidak perlu dialokasikan ulang di dalam main().
+_FLUID_KEYS = tuple(FLUID_PROPERTIES)
+_SERVICE_TYPES = ("Critical (Process)", "Essential (Utility)", "Standby")
+_SEVERITY_ICONS = {"Low": "🟢", "Medium": "🟠", "High": "🔴"}
+
+# 12 titik pengukuran vibrasi + key widget per titik, dibangun sekali di
+# module scope alih-alih 12 f-string per rerun tab mechanical.
+POINTS = tuple(f"{machine} {end} {direction}"
+               for machine in ("Pump", "Motor")
+               for end in ("DE", "NDE")
+               for direction in ("Horizontal", "Vertical", "Axial"))
+_KEYS_VEL = tuple(f"mech_vel_{p}" for p in POINTS)
+_KEYS_B1 = tuple(f"m_b1_{p}" for p in POINTS)
+_KEYS_B2 = tuple(f"m_b2_{p}" for p in POINTS)
+_KEYS_B3 = tuple(f"m_b3_{p}" for p in POINTS)
+
+# Empat titik suhu bearing: (label, default, key widget, tag temp_data).
+_TEMP_SPECS = (("Pump DE (°C)", 65, "temp_pump_de", "Pump_DE"),
+               ("Pump NDE (°C)", 63, "temp_pump_nde", "Pump_NDE"),
+               ("Motor DE (°C)", 68, "temp_motor_de", "Motor_DE"),
+               ("Motor NDE (°C)", 66, "temp_motor_nde", "Motor_NDE"))
+_TEMP_BOUNDS = (BEARING_TEMP_LIMITS["elevated_min"],
+                BEARING_TEMP_LIMITS["warning_min"])
+_TEMP_STATUS_RENDER = ((st.success, "🟢", "Normal"),
+                       (st.warning, "🟡", "Elevated"),
+                       (st.error, "🔴", "Warning"))
+
+def _classify_temp(value):
+    """Klasifikasi suhu bearing → (renderer Streamlit, ikon, label).
+
+    bisect_left mempertahankan semantik pembanding strict ">" dari rantai
+    if/elif lama: tepat di ambang masih masuk level di bawahnya.
+    """
+    return _TEMP_STATUS_RENDER[bisect.bisect_left(_TEMP_BOUNDS, value)]
+
+# Blok HTML/teks statis aplikasi: dirangkai sekali di module scope, bukan
+# sebagai literal di dalam main() pada tiap rerun. Kartu severity tab
+# Integrated dipra-render untuk ketiga level + fallback.
+_HEADER_HTML = """
+    <div style="background-color:#1E3A5F; padding:15px; border-radius:8px; margin-bottom:20px">
+    <h2 style="color:white; margin:0">🔧💧⚡ Pump Diagnostic Expert System</h2>
+    <p style="color:#E0E0E0; margin:5px 0 0 0">
+    Integrated Mechanical • Hydraulic • Electrical Analysis | Pertamina Patra Niaga
+    </p>
+    </div>
+    """
+_FOOTER_CAPTION = """
+            **Standar Acuan**: ISO 10816-3/7 | ISO 13373-1 | API 610 | IEC 60034 | API 670
+            **Algoritma**: Hybrid rule-based dengan cross-domain correlation + confidence scoring
+            ⚠️ Decision Support System - Verifikasi oleh personnel kompeten untuk keputusan kritis
+            🏭 Pertamina Patra Niaga - Asset Integrity Management
+            """
+_SEV_COLOR = {"Low": "#27ae60", "Medium": "#f39c12", "High": "#c0392b"}
+_STATUS_FIELDS = (("Mechanical", "mech"), ("Hydraulic", "hyd"),
+                  ("Electrical", "elec"), ("Integrated", "integrated"))
+_PRIORITY_COLORS = {"CRITICAL": ("🔴", "#c0392b"), "HIGH": ("🟠", "#e67e22"),
+                    "MEDIUM": ("🟡", "#f1c40f"), "LOW": ("🟢", "#27ae60")}
+
+def _render_sev_card(severity, icon, color):
+    return f"""
+                    <div style="background-color:#f0f2f6; padding:15px; border-radius:8px; border-left:5px solid {color}">
+                    <h4 style="margin:0 0 10px 0; color:#1E3A5F">⚠️ Overall Severity</h4>
+                    <p style="margin:0; font-size:1.5em; font-weight:700; color:{color};">
+                    {icon} {severity}
+                    </p>
+                    </div>
+                    """
+
+_SEV_CARD_HTML = {sev: _render_sev_card(sev, _SEVERITY_ICONS[sev], color)
+                  for sev, color in _SEV_COLOR.items()}
+_SEV_CARD_FALLBACK = _render_sev_card("Unknown", "⚪", "#95a5a6")
 
 # ============================================================================
 # FUNGSI REKOMENDASI - MULTI-DOMAIN
 # ============================================================================
-def get_mechanical_recommendation(diagnosis: str, location: str, severity: str = "Medium") -> str:
-    rec_map = {
-        "UNBALANCE": (
-            f"🔧 **{location} - Unbalance**\n"
-            f"• Lakukan single/dual plane balancing pada rotor\n"
-            f"• Periksa: material buildup pada impeller, korosi blade, keyway wear\n"
-            f"• Target residual unbalance: < 4W/N (g·mm) per ISO 1940-1\n"
-            f"• Severity: {severity} → {'Segera jadwalkan balancing' if severity != 'Low' else 'Monitor trend'}"
-        ),
-        "MISALIGNMENT": (
-            f"🔧 **{location} - Misalignment**\n"
-            f"• Lakukan laser alignment pump-motor coupling\n"
-            f"• Toleransi target: < 0.05 mm offset, < 0.05 mm/m angular\n"
-            f"• Periksa: pipe strain, soft foot, coupling wear\n"
-            f"• Severity: {severity} → {'Stop & align segera' if severity == 'High' else 'Jadwalkan alignment'}"
-        ),
-        "LOOSENESS": (
-            f"🔧 **{location} - Mechanical Looseness**\n"
-            f"• Torque check semua baut: foundation, bearing housing, baseplate\n"
-            f"• Periksa: crack pada struktur, worn dowel pins, grout deterioration\n"
-            f"• Gunakan torque wrench sesuai spec manufacturer\n"
-            f"• Severity: {severity} → {'Amankan sebelum operasi' if severity == 'High' else 'Jadwalkan tightening'}"
-        ),
-        "BEARING_EARLY": (
-            f"🔧 **{location} - Early Bearing Fault / Lubrication**\n"
-            f"• Cek lubrication: jenis grease, interval, quantity\n"
-            f"• Ambil oil sample jika applicable (particle count, viscosity)\n"
-            f"• Monitor trend Band 3 mingguan\n"
-            f"• Severity: {severity} → {'Ganti grease & monitor ketat' if severity != 'Low' else 'Lanjutkan monitoring'}"
-        ),
-        "BEARING_DEVELOPED": (
-            f"🔧 **{location} - Developed Bearing Fault**\n"
-            f"• Jadwalkan bearing replacement dalam 1-3 bulan\n"
-            f"• Siapkan spare bearing (pastikan clearance & fit sesuai spec)\n"
-            f"• Monitor weekly: jika Band 1 naik drastis → percepat jadwal\n"
-            f"• Severity: {severity} → {'Plan shutdown segera' if severity == 'High' else 'Siapkan work order'}"
-        ),
-        "BEARING_SEVERE": (
-            f"🔴 **{location} - Severe Bearing Damage**\n"
-            f"• RISK OF CATASTROPHIC FAILURE - Pertimbangkan immediate shutdown\n"
-            f"• Jika continue operasi: monitor hourly, siapkan emergency replacement\n"
-            f"• Investigasi root cause: lubrication, installation, loading?\n"
-            f"• Severity: HIGH → Action required dalam 24 jam"
-        ),
-        "Tidak Terdiagnosa": (
-            "⚠️ **Pola Tidak Konsisten**\n"
-            "• Data tidak match dengan rule mekanikal standar\n"
-            "• Kemungkinan: multi-fault interaction, measurement error, atau fault non-rutin\n"
-            "• Rekomendasi: Analisis manual oleh Vibration Analyst Level II+ dengan full spectrum review"
-        )
+# Template rekomendasi di-cache di module scope: setiap call hanya mem-format
+# satu entry terpilih, bukan membangun ulang seluruh map f-string per rerun.
+_MECH_REC_TEMPLATES = {
+    "UNBALANCE": (
+        "🔧 **{location} - Unbalance**\n"
+        "• Lakukan single/dual plane balancing pada rotor\n"
+        "• Periksa: material buildup pada impeller, korosi blade, keyway wear\n"
+        "• Target residual unbalance: < 4W/N (g·mm) per ISO 1940-1\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "MISALIGNMENT": (
+        "🔧 **{location} - Misalignment**\n"
+        "• Lakukan laser alignment pump-motor coupling\n"
+        "• Toleransi target: < 0.05 mm offset, < 0.05 mm/m angular\n"
+        "• Periksa: pipe strain, soft foot, coupling wear\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "LOOSENESS": (
+        "🔧 **{location} - Mechanical Looseness**\n"
+        "• Torque check semua baut: foundation, bearing housing, baseplate\n"
+        "• Periksa: crack pada struktur, worn dowel pins, grout deterioration\n"
+        "• Gunakan torque wrench sesuai spec manufacturer\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "BEARING_EARLY": (
+        "🔧 **{location} - Early Bearing Fault / Lubrication**\n"
+        "• Cek lubrication: jenis grease, interval, quantity\n"
+        "• Ambil oil sample jika applicable (particle count, viscosity)\n"
+        "• Monitor trend Band 3 mingguan\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "BEARING_DEVELOPED": (
+        "🔧 **{location} - Developed Bearing Fault**\n"
+        "• Jadwalkan bearing replacement dalam 1-3 bulan\n"
+        "• Siapkan spare bearing (pastikan clearance & fit sesuai spec)\n"
+        "• Monitor weekly: jika Band 1 naik drastis → percepat jadwal\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "BEARING_SEVERE": (
+        "🔴 **{location} - Severe Bearing Damage**\n"
+        "• RISK OF CATASTROPHIC FAILURE - Pertimbangkan immediate shutdown\n"
+        "• Jika continue operasi: monitor hourly, siapkan emergency replacement\n"
+        "• Investigasi root cause: lubrication, installation, loading?\n"
+        "• Severity: HIGH → Action required dalam 24 jam"
+    ),
+    "Tidak Terdiagnosa": (
+        "⚠️ **Pola Tidak Konsisten**\n"
+        "• Data tidak match dengan rule mekanikal standar\n"
+        "• Kemungkinan: multi-fault interaction, measurement error, atau fault non-rutin\n"
+        "• Rekomendasi: Analisis manual oleh Vibration Analyst Level II+ dengan full spectrum review"
+    )
+}
+
+_HYD_REC_TEMPLATES = {
+    "CAVITATION": (
+        "💧 **{fluid_type} - Cavitation Risk**\n"
+        "• Tingkatkan suction pressure atau turunkan fluid temperature\n"
+        "• Cek: strainer clogged, valve posisi, NPSH margin\n"
+        "• Target NPSH margin: > 0.5 m untuk {fluid_type}\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "IMPELLER_WEAR": (
+        "💧 **{fluid_type} - Impeller Wear / Internal Clearance**\n"
+        "• Jadwalkan inspection impeller & wear ring\n"
+        "• Ukur internal clearance vs spec OEM\n"
+        "• Pertimbangkan: fluid viscosity effect pada slip loss\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "SYSTEM_RESISTANCE_HIGH": (
+        "💧 **{fluid_type} - System Resistance Higher Than Design**\n"
+        "• Cek valve discharge position, clogged line, atau filter pressure drop\n"
+        "• Verifikasi P&ID vs as-built condition\n"
+        "• Evaluasi: apakah operating point masih dalam acceptable range?\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "EFFICIENCY_DROP": (
+        "💧 **{fluid_type} - Efficiency Degradation**\n"
+        "• Investigasi: mechanical loss vs hydraulic loss vs fluid property mismatch\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "NORMAL_OPERATION": (
+        "✅ **{fluid_type} - Normal Operation**\n"
+        "• Semua parameter dalam batas acceptable (±5% dari design)\n"
+        "• Rekam data ini sebagai baseline untuk trend monitoring\n"
+        "• Severity: Low → Continue routine monitoring"
+    ),
+    "Tidak Terdiagnosa": (
+        "⚠️ **Pola Tidak Konsisten**\n"
+        "• Data hydraulic tidak match dengan rule standar\n"
+        "• Rekomendasi: Verifikasi data lapangan + cross-check dengan electrical/mechanical data"
+    )
+}
+
+_ELEC_REC_TEMPLATES = {
+    "UNDER_VOLTAGE": (
+        "⚡ **Under Voltage Condition**\n"
+        "• Cek supply voltage di MCC: possible transformer tap / cable voltage drop\n"
+        "• Verify: motor rated voltage vs actual operating voltage\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "OVER_VOLTAGE": (
+        "⚡ **Over Voltage Condition**\n"
+        "• Cek supply voltage di MCC: possible transformer tap issue\n"
+        "• Verify: motor rated voltage vs actual operating voltage\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "VOLTAGE_UNBALANCE": (
+        "⚡ **Voltage Unbalance Detected**\n"
+        "• Cek 3-phase supply balance di source: possible single-phase loading\n"
+        "• Inspect: loose connection, corroded terminal, faulty breaker\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "CURRENT_UNBALANCE": (
+        "⚡ **Current Unbalance Detected**\n"
+        "• Investigasi: winding fault, rotor bar issue, atau supply problem\n"
+        "• Cek insulation resistance & winding resistance balance\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "OVER_LOAD": (
+        "⚡ **Over Load Condition**\n"
+        "• Motor operating above FLA rating\n"
+        "• Verify: process load, mechanical binding, or electrical issue\n"
+        "• Severity: {severity} → {action}"
+    ),
+    "UNDER_LOAD": (
+        "⚡ **Under Load Condition**\n"
+        "• Motor operating below 50% FLA\n"
+        "• Verify: process demand, pump sizing, or system resistance\n"
+        "• Severity: Low → Review operating point vs BEP"
+    ),
+    "NORMAL_ELECTRICAL": (
+        "✅ **Normal Electrical Condition**\n"
+        "• Voltage balance <2%, current balance <5%, within rated limits\n"
+        "• Severity: Low → Continue routine electrical monitoring"
+    ),
+    "Tidak Terdiagnosa": (
+        "⚠️ **Pola Tidak Konsisten**\n"
+        "• Data electrical tidak match dengan rule standar\n"
+        "• Rekomendasi: Verifikasi dengan power quality analyzer + cross-check domain lain"
+    )
+}
+
+# Action per severity (Low/Medium/High). Entri "Medium" sekaligus fallback
+# untuk severity di luar tiga nilai standar, sama seperti ternary aslinya.
+_MECH_SEV_ACTIONS = {
+    "UNBALANCE": {"Low": "Monitor trend",
+                  "Medium": "Segera jadwalkan balancing",
+                  "High": "Segera jadwalkan balancing"},
+    "MISALIGNMENT": {"Low": "Jadwalkan alignment",
+                     "Medium": "Jadwalkan alignment",
+                     "High": "Stop & align segera"},
+    "LOOSENESS": {"Low": "Jadwalkan tightening",
+                  "Medium": "Jadwalkan tightening",
+                  "High": "Amankan sebelum operasi"},
+    "BEARING_EARLY": {"Low": "Lanjutkan monitoring",
+                      "Medium": "Ganti grease & monitor ketat",
+                      "High": "Ganti grease & monitor ketat"},
+    "BEARING_DEVELOPED": {"Low": "Siapkan work order",
+                          "Medium": "Siapkan work order",
+                          "High": "Plan shutdown segera"},
+}
+
+_HYD_SEV_ACTIONS = {
+    "CAVITATION": {"Low": "Monitor intensif",
+                   "Medium": "Monitor intensif",
+                   "High": "Evaluasi immediate shutdown jika NPSH margin <0.3m"},
+    "IMPELLER_WEAR": {"Low": "Monitor trend efisiensi",
+                      "Medium": "Siapkan spare impeller",
+                      "High": "Siapkan spare impeller"},
+    "SYSTEM_RESISTANCE_HIGH": {"Low": "Jadwalkan system review",
+                               "Medium": "Jadwalkan system review",
+                               "High": "Adjust valve / clean line segera"},
+    "EFFICIENCY_DROP": {"Low": "Monitor monthly",
+                        "Medium": "Plan overhaul dalam 1-3 bulan",
+                        "High": "Plan overhaul dalam 1-3 bulan"},
+}
+
+_ELEC_SEV_ACTIONS = {
+    "UNDER_VOLTAGE": {"Low": "Monitor voltage trend",
+                      "Medium": "Monitor voltage trend",
+                      "High": "Coordinate dengan electrical team segera"},
+    "OVER_VOLTAGE": {"Low": "Monitor voltage trend",
+                     "Medium": "Monitor voltage trend",
+                     "High": "Coordinate dengan electrical team segera"},
+    "VOLTAGE_UNBALANCE": {"Low": "Monitor monthly",
+                          "Medium": "Balance supply sebelum mechanical damage",
+                          "High": "Balance supply sebelum mechanical damage"},
+    "CURRENT_UNBALANCE": {"Low": "Continue monitoring",
+                          "Medium": "Schedule electrical inspection",
+                          "High": "Schedule electrical inspection"},
+    "OVER_LOAD": {"Low": "Monitor trend closely",
+                  "Medium": "Monitor trend closely",
+                  "High": "Reduce load immediately"},
+}
+
+def _expand_templates_by_severity(templates, action_map):
+    """Pre-render varian Low/Medium/High tiap template saat import.
+
+    Placeholder {severity} dan {action} diisi sekali di sini, sehingga
+    lookup runtime tinggal dua hop dict plus format {location}/{fluid_type}
+    — tidak ada lagi evaluasi conditional action di hot path.
+    """
+    expanded = {}
+    for diag, tmpl in templates.items():
+        by_sev = action_map.get(diag)
+        expanded[diag] = {
+            sev: tmpl.replace("{severity}", sev).replace(
+                "{action}", by_sev[sev] if by_sev else "")
+            for sev in ("Low", "Medium", "High")
+        }
+    return expanded
+
+def _split_on_placeholder(by_sev_templates, placeholder):
+    """Pre-tokenize template per severity pada satu placeholder.
+
+    "A {x} B {x} C" menjadi ("A ", " B ", " C"); render runtime cukup
+    value.join(parts) — tanpa parser str.format sama sekali. Template
+    tanpa placeholder menjadi 1-tuple dan join mengembalikan konstanta.
+    """
+    return {
+        diag: {sev: tuple(tmpl.split(placeholder)) for sev, tmpl in sevs.items()}
+        for diag, sevs in by_sev_templates.items()
     }
-    return rec_map.get(diagnosis, rec_map["Tidak Terdiagnosa"])
 
+_MECH_REC_BY_SEV = _expand_templates_by_severity(_MECH_REC_TEMPLATES, _MECH_SEV_ACTIONS)
+_HYD_REC_BY_SEV = _expand_templates_by_severity(_HYD_REC_TEMPLATES, _HYD_SEV_ACTIONS)
+_ELEC_REC_BY_SEV = _expand_templates_by_severity(_ELEC_REC_TEMPLATES, _ELEC_SEV_ACTIONS)
+_MECH_REC_PARTS = _split_on_placeholder(_MECH_REC_BY_SEV, "{location}")
+_HYD_REC_PARTS = _split_on_placeholder(_HYD_REC_BY_SEV, "{fluid_type}")
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def get_mechanical_recommendation(diagnosis: str, location: str, severity: str = "Medium") -> str:
+    by_sev = _MECH_REC_PARTS.get(diagnosis) or _MECH_REC_PARTS["Tidak Terdiagnosa"]
+    parts = by_sev.get(severity) or by_sev["Medium"]
+    return location.join(parts)
+
+@st.cache_data(max_entries=256, show_spinner=False)
 def get_hydraulic_recommendation(diagnosis: str, fluid_type: str, severity: str = "Medium") -> str:
-    rec_map = {
-        "CAVITATION": (
-            f"💧 **{fluid_type} - Cavitation Risk**\n"
-            f"• Tingkatkan suction pressure atau turunkan fluid temperature\n"
-            f"• Cek: strainer clogged, valve posisi, NPSH margin\n"
-            f"• Target NPSH margin: > 0.5 m untuk {fluid_type}\n"
-            f"• Severity: {severity} → {'Evaluasi immediate shutdown jika NPSH margin <0.3m' if severity == 'High' else 'Monitor intensif'}"
-        ),
-        "IMPELLER_WEAR": (
-            f"💧 **{fluid_type} - Impeller Wear / Internal Clearance**\n"
-            f"• Jadwalkan inspection impeller & wear ring\n"
-            f"• Ukur internal clearance vs spec OEM\n"
-            f"• Pertimbangkan: fluid viscosity effect pada slip loss\n"
-            f"• Severity: {severity} → {'Siapkan spare impeller' if severity != 'Low' else 'Monitor trend efisiensi'}"
-        ),
-        "SYSTEM_RESISTANCE_HIGH": (
-            f"💧 **{fluid_type} - System Resistance Higher Than Design**\n"
-            f"• Cek valve discharge position, clogged line, atau filter pressure drop\n"
-            f"• Verifikasi P&ID vs as-built condition\n"
-            f"• Evaluasi: apakah operating point masih dalam acceptable range?\n"
-            f"• Severity: {severity} → {'Adjust valve / clean line segera' if severity == 'High' else 'Jadwalkan system review'}"
-        ),
-        "EFFICIENCY_DROP": (
-            f"💧 **{fluid_type} - Efficiency Degradation**\n"
-            f"• Investigasi: mechanical loss vs hydraulic loss vs fluid property mismatch\n"
-            f"• Severity: {severity} → {'Plan overhaul dalam 1-3 bulan' if severity != 'Low' else 'Monitor monthly'}"
-        ),
-        "NORMAL_OPERATION": (
-            f"✅ **{fluid_type} - Normal Operation**\n"
-            f"• Semua parameter dalam batas acceptable (±5% dari design)\n"
-            f"• Rekam data ini sebagai baseline untuk trend monitoring\n"
-            f"• Severity: Low → Continue routine monitoring"
-        ),
-        "Tidak Terdiagnosa": (
-            "⚠️ **Pola Tidak Konsisten**\n"
-            "• Data hydraulic tidak match dengan rule standar\n"
-            "• Rekomendasi: Verifikasi data lapangan + cross-check dengan electrical/mechanical data"
-        )
-    }
-    return rec_map.get(diagnosis, rec_map["Tidak Terdiagnosa"])
+    by_sev = _HYD_REC_PARTS.get(diagnosis) or _HYD_REC_PARTS["Tidak Terdiagnosa"]
+    parts = by_sev.get(severity) or by_sev["Medium"]
+    return fluid_type.join(parts)
 
+@st.cache_data(max_entries=256, show_spinner=False)
 def get_electrical_recommendation(diagnosis: str, severity: str = "Medium") -> str:
-    rec_map = {
-        "UNDER_VOLTAGE": (
-            f"⚡ **Under Voltage Condition**\n"
-            f"• Cek supply voltage di MCC: possible transformer tap / cable voltage drop\n"
-            f"• Verify: motor rated voltage vs actual operating voltage\n"
-            f"• Severity: {severity} → {'Coordinate dengan electrical team segera' if severity == 'High' else 'Monitor voltage trend'}"
-        ),
-        "OVER_VOLTAGE": (
-            f"⚡ **Over Voltage Condition**\n"
-            f"• Cek supply voltage di MCC: possible transformer tap issue\n"
-            f"• Verify: motor rated voltage vs actual operating voltage\n"
-            f"• Severity: {severity} → {'Coordinate dengan electrical team segera' if severity == 'High' else 'Monitor voltage trend'}"
-        ),
-        "VOLTAGE_UNBALANCE": (
-            f"⚡ **Voltage Unbalance Detected**\n"
-            f"• Cek 3-phase supply balance di source: possible single-phase loading\n"
-            f"• Inspect: loose connection, corroded terminal, faulty breaker\n"
-            f"• Severity: {severity} → {'Balance supply sebelum mechanical damage' if severity != 'Low' else 'Monitor monthly'}"
-        ),
-        "CURRENT_UNBALANCE": (
-            f"⚡ **Current Unbalance Detected**\n"
-            f"• Investigasi: winding fault, rotor bar issue, atau supply problem\n"
-            f"• Cek insulation resistance & winding resistance balance\n"
-            f"• Severity: {severity} → {'Schedule electrical inspection' if severity != 'Low' else 'Continue monitoring'}"
-        ),
-        "OVER_LOAD": (
-            f"⚡ **Over Load Condition**\n"
-            f"• Motor operating above FLA rating\n"
-            f"• Verify: process load, mechanical binding, or electrical issue\n"
-            f"• Severity: {severity} → {'Reduce load immediately' if severity == 'High' else 'Monitor trend closely'}"
-        ),
-        "UNDER_LOAD": (
-            f"⚡ **Under Load Condition**\n"
-            f"• Motor operating below 50% FLA\n"
-            f"• Verify: process demand, pump sizing, or system resistance\n"
-            f"• Severity: Low → Review operating point vs BEP"
-        ),
-        "NORMAL_ELECTRICAL": (
-            f"✅ **Normal Electrical Condition**\n"
-            f"• Voltage balance <2%, current balance <5%, within rated limits\n"
-            f"• Severity: Low → Continue routine electrical monitoring"
-        ),
-        "Tidak Terdiagnosa": (
-            "⚠️ **Pola Tidak Konsisten**\n"
-            "• Data electrical tidak match dengan rule standar\n"
-            "• Rekomendasi: Verifikasi dengan power quality analyzer + cross-check domain lain"
-        )
-    }
-    return rec_map.get(diagnosis, rec_map["Tidak Terdiagnosa"])
+    by_sev = _ELEC_REC_BY_SEV.get(diagnosis) or _ELEC_REC_BY_SEV["Tidak Terdiagnosa"]
+    return by_sev.get(severity) or by_sev["Medium"]
 
 # ============================================================================
 # FUNGSI TEMPERATURE ANALYSIS
 # ============================================================================
+# Threshold terurut + tabel status: klasifikasi jadi satu bisect C-level,
+# dan bisa divektorkan untuk banyak sensor via np.searchsorted.
+_TEMP_THRESHOLDS = (BEARING_TEMP_LIMITS["normal_max"],
+                    BEARING_TEMP_LIMITS["elevated_max"],
+                    BEARING_TEMP_LIMITS["warning_max"])
+_TEMP_STATUS = (("Normal", "🟢", 0),
+                ("Elevated", "🟡", 0),
+                ("Warning", "🟠", 1),
+                ("Critical", "🔴", 2))
+
 def get_temperature_status(temp_celsius):
     if temp_celsius is None or temp_celsius == 0:
         return "N/A", "⚪", 0
-    if temp_celsius < BEARING_TEMP_LIMITS["normal_max"]:
-        return "Normal", "🟢", 0
-    elif temp_celsius < BEARING_TEMP_LIMITS["elevated_max"]:
-        return "Elevated", "🟡", 0
-    elif temp_celsius < BEARING_TEMP_LIMITS["warning_max"]:
-        return "Warning", "🟠", 1
-    else:
-        return "Critical", "🔴", 2
+    return _TEMP_STATUS[bisect.bisect_right(_TEMP_THRESHOLDS, temp_celsius)]
+
+# Lookup 4x2: baris = status (Normal/Elevated/Warning/Critical), kolom =
+# diagnosis_consistent (0/1). Menggantikan cascade if Critical/Warning/...
+_TEMP_ADJ_LUT = np.array([[0, 0],
+                          [0, 10],
+                          [-5, 15],
+                          [-10, 20]], dtype=np.int64)
+_TEMP_NOTE_TEMPLATES = (
+    (None, None),
+    ("📈 {loc}: {t}°C (Elevated) - Monitor trend",
+     "📈 {loc}: {t}°C (Elevated) - Early thermal indication"),
+    ("⚠️ {loc}: {t}°C (Warning) - Monitor closely",
+     "⚠️ {loc}: {t}°C (Warning) - Thermal confirmation"),
+    ("⚠️ {loc}: {t}°C (Critical) - Review required",
+     "⚠️ {loc}: {t}°C (Critical) - Strong thermal confirmation"),
+)
+_TEMP_THRESH_ARR = np.asarray(_TEMP_THRESHOLDS, dtype=np.float64)
 
 def calculate_temperature_confidence_adjustment(temp_dict, diagnosis_consistent):
     adjustment = 0
     notes = []
-    for location, temp in temp_dict.items():
-        if temp is None or temp == 0:
-            continue
-        status, color, sev_level = get_temperature_status(temp)
-        if status == "Critical":
-            if diagnosis_consistent:
-                adjustment += 20
-                notes.append(f"⚠️ {location}: {temp}°C (Critical) - Strong thermal confirmation")
-            else:
-                adjustment -= 10
-                notes.append(f"⚠️ {location}: {temp}°C (Critical) - Review required")
-        elif status == "Warning":
-            if diagnosis_consistent:
-                adjustment += 15
-                notes.append(f"⚠️ {location}: {temp}°C (Warning) - Thermal confirmation")
-            else:
-                adjustment -= 5
-                notes.append(f"⚠️ {location}: {temp}°C (Warning) - Monitor closely")
-        elif status == "Elevated":
-            if diagnosis_consistent:
-                adjustment += 10
-                notes.append(f"📈 {location}: {temp}°C (Elevated) - Early thermal indication")
-            else:
-                notes.append(f"📈 {location}: {temp}°C (Elevated) - Monitor trend")
-    
+    consistent = 1 if diagnosis_consistent else 0
+    readings = [(loc, t) for loc, t in temp_dict.items() if t is not None and t != 0]
+    if readings:
+        temps = np.asarray([t for _, t in readings], dtype=np.float64)
+        status_idxs = np.searchsorted(_TEMP_THRESH_ARR, temps, side='right')
+        adjustment = int(_TEMP_ADJ_LUT[status_idxs, consistent].sum())
+        for (location, temp), idx in zip(readings, status_idxs):
+            tmpl = _TEMP_NOTE_TEMPLATES[idx][consistent]
+            if tmpl:
+                notes.append(tmpl.format(loc=location, t=temp))
+
     if temp_dict.get("Pump_DE") and temp_dict.get("Pump_NDE"):
         delta_pump = abs(temp_dict["Pump_DE"] - temp_dict["Pump_NDE"])
-        if delta_pump > BEARING_TEMP_LIMITS["delta_threshold"]:
+        if delta_pump > _DELTA_THRESHOLD:
             adjustment += 5
             notes.append(f"🔍 Pump DE-NDE ΔT: {delta_pump}°C (>15°C) - Localized fault indicated")
     
     if temp_dict.get("Motor_DE") and temp_dict.get("Motor_NDE"):
         delta_motor = abs(temp_dict["Motor_DE"] - temp_dict["Motor_NDE"])
-        if delta_motor > BEARING_TEMP_LIMITS["delta_threshold"]:
+        if delta_motor > _DELTA_THRESHOLD:
             adjustment += 5
             notes.append(f"🔍 Motor DE-NDE ΔT: {delta_motor}°C (>15°C) - Localized fault indicated")
     
@@ -281,7 +508,7 @@ def calculate_temperature_confidence_adjustment(temp_dict, diagnosis_consistent)
         if temp_dict["Motor_DE"] > temp_dict["Pump_DE"] + 10:
             notes.append("⚡ Motor DE > Pump DE - Possible electrical origin")
     
-    return min(20, max(-10, adjustment)), notes
+    return int(np.clip(adjustment, -10, 20)), notes
 
 # ============================================================================
 # FUNGSI PERHITUNGAN - HYDRAULIC DOMAIN
@@ -299,6 +526,87 @@ def calculate_hydraulic_parameters(suction_pressure, discharge_pressure, flow_ra
         "efficiency_percent": efficiency
     }
 
+# Kode pattern integer untuk jalur batch; mapping balik ke label string
+# dilakukan di sisi reporting.
+HYD_PATTERN_UNDER_PERFORMANCE = 0
+HYD_PATTERN_OVER_RESISTANCE = 1
+HYD_PATTERN_EFFICIENCY_DROP = 2
+HYD_PATTERN_NORMAL = 3
+HYD_PATTERN_MIXED_DEVIATION = 4
+HYD_PATTERN_LABELS = ("UNDER_PERFORMANCE", "OVER_RESISTANCE",
+                      "EFFICIENCY_DROP", "NORMAL", "MIXED_DEVIATION")
+
+def classify_hydraulic_performance_batch(head_aktual, head_design, efficiency_aktual,
+                                         efficiency_bep, flow_aktual, flow_design):
+    """Klasifikasi pattern performa hidrolik untuk N pompa sekaligus.
+
+    Semua argumen array-like dengan panjang sama; return `(patterns, devs)`
+    dengan `patterns` int8 (N,) berisi kode HYD_PATTERN_* dan `devs` float
+    (N,3) berisi deviasi head/efficiency/flow dalam persen. Aturan dan
+    prioritasnya identik dengan classify_hydraulic_performance.
+    """
+    head_aktual = np.asarray(head_aktual, dtype=np.float64)
+    head_design = np.asarray(head_design, dtype=np.float64)
+    efficiency_aktual = np.asarray(efficiency_aktual, dtype=np.float64)
+    efficiency_bep = np.asarray(efficiency_bep, dtype=np.float64)
+    flow_aktual = np.asarray(flow_aktual, dtype=np.float64)
+    flow_design = np.asarray(flow_design, dtype=np.float64)
+
+    dev_head = np.where(head_design > 0,
+                        (head_aktual - head_design) / np.where(head_design > 0, head_design, 1) * 100, 0)
+    dev_eff = np.where(efficiency_bep > 0,
+                       (efficiency_aktual - efficiency_bep) / np.where(efficiency_bep > 0, efficiency_bep, 1) * 100, 0)
+    dev_flow = np.where(flow_design > 0,
+                        (flow_aktual - flow_design) / np.where(flow_design > 0, flow_design, 1) * 100, 0)
+
+    patterns = np.select(
+        [(dev_head < -5) & (dev_eff < -5),
+         (dev_head > 5) & (dev_flow < -5),
+         (dev_eff < -10) & (np.abs(dev_head) <= 5),
+         (np.abs(dev_head) <= 5) & (np.abs(dev_eff) <= 5) & (np.abs(dev_flow) <= 5)],
+        [HYD_PATTERN_UNDER_PERFORMANCE,
+         HYD_PATTERN_OVER_RESISTANCE,
+         HYD_PATTERN_EFFICIENCY_DROP,
+         HYD_PATTERN_NORMAL],
+        default=HYD_PATTERN_MIXED_DEVIATION
+    ).astype(np.int8)
+    return patterns, np.stack([dev_head, dev_eff, dev_flow], axis=1)
+
+def calculate_hydraulic_parameters_batch(suction_pressure, discharge_pressure, flow_rate,
+                                         motor_power, sg, fluid_temp_c=40):
+    """Versi batch calculate_hydraulic_parameters untuk N pompa sekaligus.
+
+    Semua argumen array-like panjang N; guard pembagian-nol memakai
+    np.where. Return dict of arrays dengan key yang sama seperti versi
+    skalar.
+    """
+    suction_pressure = np.asarray(suction_pressure, dtype=np.float64)
+    discharge_pressure = np.asarray(discharge_pressure, dtype=np.float64)
+    flow_rate = np.asarray(flow_rate, dtype=np.float64)
+    motor_power = np.asarray(motor_power, dtype=np.float64)
+    sg = np.asarray(sg, dtype=np.float64)
+
+    delta_p = discharge_pressure - suction_pressure
+    head = np.where(sg > 0, delta_p * 10.2 / np.where(sg > 0, sg, 1), 0)
+    hydraulic_power = np.where((flow_rate > 0) & (head > 0),
+                               flow_rate * head * sg * 9.81 / 3600, 0)
+    efficiency = np.where(motor_power > 0,
+                          hydraulic_power / np.where(motor_power > 0, motor_power, 1) * 100, 0)
+    return {
+        "delta_p_bar": delta_p,
+        "head_m": head,
+        "hydraulic_power_kw": hydraulic_power,
+        "efficiency_percent": efficiency
+    }
+
+# Estimasi NPSHr konservatif per kelas flow: lookup searchsorted, bukan
+# rantai if/elif, sehingga siap divektorisasi untuk batch flow sekaligus.
+_NPSHR_BINS = np.array([50.0, 200.0])
+_NPSHR_VALS = np.array([3.0, 4.0, 5.5])
+
+def estimate_npshr_conservative(Q_m3h):
+    return float(_NPSHR_VALS[np.searchsorted(_NPSHR_BINS, Q_m3h, side="right")])
+
 def classify_hydraulic_performance(head_aktual, head_design, efficiency_aktual,
                                    efficiency_bep, flow_aktual, flow_design):
     dev_head = ((head_aktual - head_design) / head_design * 100) if head_design > 0 else 0
@@ -316,21 +624,69 @@ def classify_hydraulic_performance(head_aktual, head_design, efficiency_aktual,
     else:
         return "MIXED_DEVIATION", {"head_dev": dev_head, "eff_dev": dev_eff, "flow_dev": dev_flow}
 
+# ============================================================================
+# ID INTEGER UNTUK DIAGNOSIS/FAULT (INTERN DI PRODUSEN)
+# ============================================================================
+class DiagId(IntFlag):
+    """ID diagnosis yang dipakai rule korelasi lintas-domain."""
+    NONE = 0
+    MISALIGNMENT = 1
+    LOOSENESS = 2
+    OVER_LOAD = 4
+
+class FaultId(IntFlag):
+    """ID fault_type yang dipakai rule korelasi lintas-domain."""
+    NONE = 0
+    VOLTAGE = 1
+    CAVITATION = 2
+    WEAR = 4
+    EFFICIENCY = 8
+
+_DIAG_IDS = {"MISALIGNMENT": DiagId.MISALIGNMENT,
+             "LOOSENESS": DiagId.LOOSENESS,
+             "OVER_LOAD": DiagId.OVER_LOAD}
+_FAULT_IDS = {"voltage": FaultId.VOLTAGE,
+              "cavitation": FaultId.CAVITATION,
+              "wear": FaultId.WEAR,
+              "efficiency": FaultId.EFFICIENCY}
+_MECH_MASK_ALIGN_LOOSE = DiagId.MISALIGNMENT | DiagId.LOOSENESS
+
+# Catatan korelasi temperatur sebagai konstanta modul — literal f-string
+# tanpa interpolasi tetap membangun objek baru tiap panggilan.
+_NOTE_PUMP_DELTA = "Pump DE-NDE ΔT >15°C → Localized fault on DE bearing"
+_NOTE_MOTOR_HOTTER = "Motor DE > Pump DE → Possible electrical origin"
+_NOTE_CRITICAL_TEMP = "⚠️ Critical bearing temperature detected"
+
+def _attach_rule_ids(result):
+    """Intern string diagnosis/fault_type ke ID integer sekali di produsen,
+    supaya agregator cukup membandingkan integer (tanpa hash string dan
+    scan list keanggotaan).
+
+    Disimpan sebagai int polos, bukan member enum: hasil ini hidup di
+    st.session_state lintas rerun, sedangkan Streamlit mendefinisikan ulang
+    kelas DiagId/FaultId pada tiap eksekusi script — member dari run lama
+    tidak bisa di-pickle terhadap kelas yang baru. Perbandingan ==/& milik
+    agregator tetap bekerja identik dengan int.
+    """
+    result["diagnosis_id"] = int(_DIAG_IDS.get(result.get("diagnosis"), DiagId.NONE))
+    result["fault_id"] = int(_FAULT_IDS.get(result.get("fault_type"), FaultId.NONE))
+    return result
+
 # ============================================================================
 # FUNGSI PERHITUNGAN - ELECTRICAL DOMAIN
 # ============================================================================
 def calculate_electrical_parameters(v_l1l2, v_l2l3, v_l3l1, i_l1, i_l2, i_l3,
                                     rated_voltage, fla):
-    v_avg = (v_l1l2 + v_l2l3 + v_l3l1) / 3
-    i_avg = (i_l1 + i_l2 + i_l3) / 3
-    v_deviations = [abs(v - v_avg) for v in [v_l1l2, v_l2l3, v_l3l1]]
-    voltage_unbalance = (max(v_deviations) / v_avg * 100) if v_avg > 0 else 0
-    i_deviations = [abs(i - i_avg) for i in [i_l1, i_l2, i_l3]]
-    current_unbalance = (max(i_deviations) / i_avg * 100) if i_avg > 0 else 0
+    v = np.asarray([v_l1l2, v_l2l3, v_l3l1], dtype=np.float64)
+    i = np.asarray([i_l1, i_l2, i_l3], dtype=np.float64)
+    v_avg = float(v.mean())
+    i_avg = float(i.mean())
+    voltage_unbalance = float(np.abs(v - v_avg).max() / v_avg * 100) if v_avg > 0 else 0
+    current_unbalance = float(np.abs(i - i_avg).max() / i_avg * 100) if i_avg > 0 else 0
     load_estimate = (i_avg / fla * 100) if fla > 0 else 0
-    voltage_within_tolerance = (ELECTRICAL_LIMITS["voltage_tolerance_low"] <=
+    voltage_within_tolerance = (_VOLT_TOL_LOW <=
                                 (v_avg / rated_voltage * 100) <=
-                                ELECTRICAL_LIMITS["voltage_tolerance_high"])
+                                _VOLT_TOL_HIGH)
     return {
         "v_avg": v_avg,
         "i_avg": i_avg,
@@ -372,22 +728,22 @@ def diagnose_electrical_condition(electrical_calc, motor_specs):
             "current_unbalance": current_unbalance,
             "load_estimate": load_estimate
         }
-        return result
+        return _attach_rule_ids(result)
     
-    if voltage_unbalance > ELECTRICAL_LIMITS["voltage_unbalance_warning"]:
+    if voltage_unbalance > _VOLT_UNB_WARNING:
         result["diagnosis"] = "VOLTAGE_UNBALANCE"
-        calculated_conf = 60 + int((voltage_unbalance - ELECTRICAL_LIMITS["voltage_unbalance_warning"]) * 15)
+        calculated_conf = 60 + int((voltage_unbalance - _VOLT_UNB_WARNING) * 15)
         result["confidence"] = min(95, calculated_conf)
-        result["severity"] = "High" if voltage_unbalance > ELECTRICAL_LIMITS["voltage_unbalance_critical"] else "Medium"
+        result["severity"] = "High" if voltage_unbalance > _VOLT_UNB_CRITICAL else "Medium"
         result["fault_type"] = "voltage"
-    elif current_unbalance > ELECTRICAL_LIMITS["current_unbalance_warning"]:
+    elif current_unbalance > _CURR_UNB_WARNING:
         result["diagnosis"] = "CURRENT_UNBALANCE"
-        calculated_conf = 60 + int((current_unbalance - ELECTRICAL_LIMITS["current_unbalance_warning"]) * 5)
+        calculated_conf = 60 + int((current_unbalance - _CURR_UNB_WARNING) * 5)
         result["confidence"] = min(95, calculated_conf)
-        result["severity"] = "High" if current_unbalance > ELECTRICAL_LIMITS["current_unbalance_critical"] else "Medium"
+        result["severity"] = "High" if current_unbalance > _CURR_UNB_CRITICAL else "Medium"
         result["fault_type"] = "current"
     else:
-        if load_estimate > ELECTRICAL_LIMITS["current_load_critical"]:
+        if load_estimate > _LOAD_CRITICAL:
             result["diagnosis"] = "OVER_LOAD"
             result["confidence"] = min(95, 55 + int(load_estimate - 100))
             result["severity"] = "Medium"
@@ -402,11 +758,92 @@ def diagnose_electrical_condition(electrical_calc, motor_specs):
             "current_unbalance": current_unbalance,
             "load_estimate": load_estimate
         }
-    return result
+    return _attach_rule_ids(result)
 
 # ============================================================================
 # FUNGSI DIAGNOSA - MECHANICAL DOMAIN (MULTI-POINT SUPPORT)
 # ============================================================================
+@dataclass
+class MechanicalSample:
+    """Snapshot SoA satu set pengukuran mekanikal.
+
+    Dict dari UI dikonversi sekali di ingest menjadi array paralel dengan
+    `labels`, sehingga kernel diagnosa bekerja pada ndarray tanpa lookup
+    dict/list-of-tuples berulang per titik.
+    """
+    labels: tuple
+    label_parts: tuple  # per titik: (machine, end, direction)
+    vel: np.ndarray     # (N,) overall velocity mm/s
+    bands: np.ndarray   # (N,3) Band1..Band3 akselerasi (g)
+    fft: tuple          # per titik: ndarray (M,2) kolom (freq, amp)
+
+    @staticmethod
+    def _parse_label(label):
+        bits = label.split()
+        return tuple(bits[:3]) if len(bits) >= 3 else ("Pump", "DE", "Horizontal")
+
+    @classmethod
+    def from_mappings(cls, vel_data, bands_data, fft_data_dict, rpm_hz):
+        labels = tuple(bands_data)
+        label_parts = tuple(cls._parse_label(p) for p in labels)
+        vel = np.asarray([vel_data.get(p, 0) for p in labels], dtype=np.float64)
+        bands = np.asarray(
+            [[bands_data[p].get("Band1", 0),
+              bands_data[p].get("Band2", 0),
+              bands_data[p].get("Band3", 0)] for p in labels],
+            dtype=np.float64
+        )
+        default_fft = ((rpm_hz, 0.1), (2 * rpm_hz, 0.05))
+        fft = tuple(
+            np.asarray(fft_data_dict.get(p, default_fft), dtype=np.float64).reshape(-1, 2)
+            for p in labels
+        )
+        return cls(labels=labels, label_parts=label_parts, vel=vel, bands=bands, fft=fft)
+
+def _classify_bearing_bands(b1, b2, b3, t_b1_severe, t_b2_confirm,
+                            t_b2_developed, t_b2_high, t_b3_confirm, t_b3_early):
+    """Klasifikasi bearing fault per titik dari tiga band akselerasi.
+
+    Kernel numerik murni (tanpa dict/string lookup) agar murah dipanggil
+    per titik; threshold sudah dikalikan baseline oleh caller sehingga di
+    sini tinggal perbandingan. Return (fault_type, severity) atau
+    (None, None) jika normal.
+    """
+    if b1 > t_b1_severe and b2 > t_b2_confirm:
+        return "BEARING_SEVERE", "High"
+    if b2 > t_b2_developed and b3 > t_b3_confirm:
+        return "BEARING_DEVELOPED", "High" if b2 > t_b2_high else "Medium"
+    if b3 > t_b3_early:
+        return "BEARING_EARLY", "Medium"
+    return None, None
+
+def _extract_fft_amps(fft_arr, rpm_hz):
+    """Ambil amplitudo 1x dan 2x RPM dari spektrum (M,2) dalam satu pass NumPy.
+
+    Seperti scan generator aslinya, peak pertama dalam toleransi ±5% yang
+    diambil; 0 jika tidak ada peak yang match.
+    """
+    if fft_arr.size == 0:
+        return 0.0, 0.0
+    freqs = fft_arr[:, 0]
+    amps = fft_arr[:, 1]
+    idx_1x = np.flatnonzero(np.abs(freqs - rpm_hz) < 0.05 * rpm_hz)
+    idx_2x = np.flatnonzero(np.abs(freqs - 2 * rpm_hz) < 0.05 * rpm_hz)
+    amp_1x = float(amps[idx_1x[0]]) if idx_1x.size else 0.0
+    amp_2x = float(amps[idx_2x[0]]) if idx_2x.size else 0.0
+    return amp_1x, amp_2x
+
+# Prioritas diagnosis sistem: entri pertama yang match pada salah satu titik
+# menentukan (fault, fault_type, confidence); high-freq menang atas low-freq.
+_MECH_FAULT_PRIORITY = (
+    ("BEARING_SEVERE", "high_freq", 85),
+    ("BEARING_DEVELOPED", "high_freq", 85),
+    ("BEARING_EARLY", "high_freq", 85),
+    ("UNBALANCE", "low_freq", 75),
+    ("MISALIGNMENT", "low_freq", 75),
+    ("LOOSENESS", "low_freq", 75),
+)
+
 def diagnose_mechanical_system(vel_data, bands_data, fft_data_dict, rpm_hz, temp_data):
     result = {
         "diagnosis": "Normal",
@@ -421,79 +858,77 @@ def diagnose_mechanical_system(vel_data, bands_data, fft_data_dict, rpm_hz, temp
     
     limit_warning = ISO_LIMITS_VELOCITY["Zone B (Acceptable)"]
     limit_danger = ISO_LIMITS_VELOCITY["Zone C (Unacceptable)"]
-    worst_bearing_severity = "Low"
-    bearing_diag = "Normal"
     base3 = ACCEL_BASELINE["Band3 (5-16kHz)"]
     base2 = ACCEL_BASELINE["Band2 (1.5-5kHz)"]
     base1 = ACCEL_BASELINE["Band1 (0.5-1.5kHz)"]
+
+    # Loop-invariant: produk threshold x baseline dihitung sekali di sini,
+    # bukan per titik di dalam loop.
+    t_b1_severe = 2.5 * base1
+    t_b2_confirm = 1.5 * base2
+    t_b2_developed = 2.0 * base2
+    t_b2_high = 3.0 * base2
+    t_b3_confirm = 1.5 * base3
+    t_b3_early = 2.0 * base3
     
     problematic_points = []
-    
-    for point, bands in bands_data.items():
-        b3 = bands.get("Band3", 0)
-        b2 = bands.get("Band2", 0)
-        b1 = bands.get("Band1", 0)
-        vel = vel_data.get(point, 0)
-        
+
+    # Konversi dict/list-of-tuples dari UI menjadi SoA sekali di sini;
+    # loop di bawah hanya membaca array paralel.
+    sample = MechanicalSample.from_mappings(vel_data, bands_data, fft_data_dict, rpm_hz)
+
+    # Velocity di-key ulang dengan tuple (machine, end, direction) sekali di
+    # sini; rule arah di bawah tinggal lookup tuple, tanpa sintesis string.
+    vel_by_key = {}
+    for p, v in vel_data.items():
+        bits = p.split()
+        if len(bits) >= 3:
+            vel_by_key[(bits[0], bits[1], bits[2])] = v
+
+    # Jumlah titik Vertical yang tinggi invariant terhadap loop di bawah;
+    # hitung sekali di sini, bukan per titik Vertical di dalam rule LOOSENESS.
+    high_verts = sum(1 for p, v in vel_data.items() if "Vertical" in p and v > limit_warning)
+
+    for i, point in enumerate(sample.labels):
+        b1, b2, b3 = sample.bands[i]
+        vel = float(sample.vel[i])
+
         point_diagnosis = {
             "velocity": vel,
-            "bands": bands,
+            "bands": bands_data[point],
             "fault_type": "normal",
             "severity": "Low"
         }
-        
-        if b1 > 2.5 * base1 and b2 > 1.5 * base2:
-            point_diagnosis["fault_type"] = "BEARING_SEVERE"
-            point_diagnosis["severity"] = "High"
-            worst_bearing_severity = "High"
-            bearing_diag = "BEARING_SEVERE"
-            problematic_points.append(point)
-        elif b2 > 2.0 * base2 and b3 > 1.5 * base3:
-            point_diagnosis["fault_type"] = "BEARING_DEVELOPED"
-            point_diagnosis["severity"] = "High" if b2 > 3*base2 else "Medium"
-            if point_diagnosis["severity"] == "High":
-                worst_bearing_severity = "High"
-            bearing_diag = "BEARING_DEVELOPED"
-            problematic_points.append(point)
-        elif b3 > 2.0 * base3:
-            if worst_bearing_severity == "Low":
-                worst_bearing_severity = "Medium"
-            point_diagnosis["fault_type"] = "BEARING_EARLY"
-            point_diagnosis["severity"] = "Medium"
-            bearing_diag = "BEARING_EARLY"
+
+        bearing_fault, bearing_sev = _classify_bearing_bands(
+            b1, b2, b3, t_b1_severe, t_b2_confirm, t_b2_developed,
+            t_b2_high, t_b3_confirm, t_b3_early)
+        if bearing_fault is not None:
+            point_diagnosis["fault_type"] = bearing_fault
+            point_diagnosis["severity"] = bearing_sev
             problematic_points.append(point)
-        
+
         if vel > limit_warning:
             low_freq_severity = "High" if vel > limit_danger else "Medium"
-            parts = point.split()
-            if len(parts) >= 3:
-                machine = parts[0]
-                end = parts[1]
-                direction = parts[2]
-            else:
-                machine, end, direction = "Pump", "DE", "Horizontal"
-            
-            fft_champ_data = fft_data_dict.get(point, [(rpm_hz, 0.1), (2*rpm_hz, 0.05)])
-            
-            amp_1x = next((p[1] for p in fft_champ_data if abs(p[0]-rpm_hz) < 0.05*rpm_hz), 0)
-            amp_2x = next((p[1] for p in fft_champ_data if abs(p[0]-2*rpm_hz) < 0.05*rpm_hz), 0)
+            machine, end, direction = sample.label_parts[i]
+
+            fft_arr = sample.fft[i]
+
+            amp_1x, amp_2x = _extract_fft_amps(fft_arr, rpm_hz)
             
             low_freq_diag = None
             if direction == "Axial" and end == "DE":
                 opp_machine = "Pump" if machine == "Motor" else "Motor"
-                opp_point = f"{opp_machine} DE Axial"
-                opp_vel = vel_data.get(opp_point, 0)
+                opp_vel = vel_by_key.get((opp_machine, "DE", "Axial"), 0)
                 if amp_2x > 0.5 * amp_1x or opp_vel > limit_warning:
                     low_freq_diag = "MISALIGNMENT"
             elif direction == "Horizontal":
                 opp_end = "NDE" if end == "DE" else "DE"
-                opp_point = f"{machine} {opp_end} Horizontal"
-                opp_vel = vel_data.get(opp_point, 0)
-                total_fft = sum(p[1] for p in fft_champ_data) if fft_champ_data else 1
+                opp_vel = vel_by_key.get((machine, opp_end, "Horizontal"), 0)
+                total_fft = float(fft_arr[:, 1].sum()) if fft_arr.size else 1
                 if amp_1x > 0.7 * total_fft or opp_vel > limit_warning:
                     low_freq_diag = "UNBALANCE"
             elif direction == "Vertical":
-                high_verts = sum(1 for p, v in vel_data.items() if "Vertical" in p and v > limit_warning)
                 if high_verts >= 2 or (amp_2x > 0.1 and amp_1x > 0.1):
                     low_freq_diag = "LOOSENESS"
             
@@ -511,24 +946,15 @@ def diagnose_mechanical_system(vel_data, bands_data, fft_data_dict, rpm_hz, temp
     elif any(p["severity"] == "Medium" for p in result["point_diagnoses"].values()):
         result["severity"] = "Medium"
     
-    high_freq_faults = ["BEARING_SEVERE", "BEARING_DEVELOPED", "BEARING_EARLY"]
-    low_freq_faults = ["UNBALANCE", "MISALIGNMENT", "LOOSENESS"]
-    
-    for fault in high_freq_faults:
-        if any(p["fault_type"] == fault for p in result["point_diagnoses"].values()):
+    fault_types_present = {p["fault_type"] for p in result["point_diagnoses"].values()}
+    for fault, kind, confidence in _MECH_FAULT_PRIORITY:
+        if fault in fault_types_present:
             result["diagnosis"] = fault
-            result["fault_type"] = "high_freq"
-            result["confidence"] = 85
+            result["fault_type"] = kind
+            result["confidence"] = confidence
             break
-    else:
-        for fault in low_freq_faults:
-            if any(p["fault_type"] == fault for p in result["point_diagnoses"].values()):
-                result["diagnosis"] = fault
-                result["fault_type"] = "low_freq"
-                result["confidence"] = 75
-                break
-    
-    return result
+
+    return _attach_rule_ids(result)
 
 # ============================================================================
 # FUNGSI DIAGNOSA - HYDRAULIC DOMAIN (REVISI - TANPA OBSERVASI)
@@ -554,6 +980,10 @@ def diagnose_hydraulic_single_point(hydraulic_calc, design_params, fluid_props,
         head_aktual, head_design, eff_aktual, eff_bep, flow_aktual, flow_design
     )
     result["details"]["deviations"] = deviations
+    # Unpack sekali; branch di bawah cukup membaca local, bukan .get() berulang.
+    head_dev = deviations.get("head_dev", 0)
+    eff_dev = deviations.get("eff_dev", 0)
+    flow_dev = deviations.get("flow_dev", 0)
     
     suction_pressure_bar = context.get("suction_pressure_bar", 0)
     vapor_pressure_kpa = fluid_props.get("vapor_pressure_kpa_38C", 0)
@@ -569,41 +999,112 @@ def diagnose_hydraulic_single_point(hydraulic_calc, design_params, fluid_props,
         result["confidence"] = min(90, 70 + int((0.5 - npsh_margin) * 20) if npsh_margin < 0.5 else 70)
         result["severity"] = "High" if npsh_margin < 0.3 else "Medium"
         result["fault_type"] = "cavitation"
-        return result
+        return _attach_rule_ids(result)
     
     if pattern == "UNDER_PERFORMANCE":
         result["diagnosis"] = "IMPELLER_WEAR"
-        result["confidence"] = min(85, 60 + int(abs(deviations.get("head_dev", 0)) * 2))
-        result["severity"] = "High" if deviations.get("head_dev", 0) < -15 else "Medium"
+        result["confidence"] = min(85, 60 + int(abs(head_dev) * 2))
+        result["severity"] = "High" if head_dev < -15 else "Medium"
         result["fault_type"] = "wear"
-        return result
+        return _attach_rule_ids(result)
     
     if pattern == "OVER_RESISTANCE":
         result["diagnosis"] = "SYSTEM_RESISTANCE_HIGH"
-        result["confidence"] = min(90, 70 + int(abs(deviations.get("head_dev", 0))))
-        result["severity"] = "High" if deviations.get("flow_dev", 0) < -30 else "Medium"
+        result["confidence"] = min(90, 70 + int(abs(head_dev)))
+        result["severity"] = "High" if flow_dev < -30 else "Medium"
         result["fault_type"] = "system"
-        return result
+        return _attach_rule_ids(result)
     
     if pattern == "EFFICIENCY_DROP":
         result["diagnosis"] = "EFFICIENCY_DROP"
-        result["confidence"] = min(80, 65 + int(abs(deviations.get("eff_dev", 0))))
-        result["severity"] = "High" if deviations.get("eff_dev", 0) < -20 else "Medium"
+        result["confidence"] = min(80, 65 + int(abs(eff_dev)))
+        result["severity"] = "High" if eff_dev < -20 else "Medium"
         result["fault_type"] = "efficiency"
-        return result
+        return _attach_rule_ids(result)
     
     if pattern == "NORMAL":
         result["diagnosis"] = "NORMAL_OPERATION"
         result["confidence"] = 95
         result["severity"] = "Low"
         result["fault_type"] = "normal"
-        return result
+        return _attach_rule_ids(result)
     
     result["diagnosis"] = "Tidak Terdiagnosa"
     result["confidence"] = 40
     result["severity"] = "Medium"
     result["fault_type"] = "unknown"
-    return result
+    return _attach_rule_ids(result)
+
+# Decode table jalur fleet: kode int8 → (diagnosis, fault_type), indeks 0-5.
+HYD_DIAG_DECODE = (("NORMAL_OPERATION", "normal"),
+                   ("CAVITATION", "cavitation"),
+                   ("IMPELLER_WEAR", "wear"),
+                   ("SYSTEM_RESISTANCE_HIGH", "system"),
+                   ("EFFICIENCY_DROP", "efficiency"),
+                   ("Tidak Terdiagnosa", "unknown"))
+SEVERITY_DECODE = ("Low", "Medium", "High")
+
+def diagnose_hydraulic_fleet(head_aktual, eff_aktual, flow_aktual, suction_pressure_bar,
+                             head_design, eff_bep, flow_design, npsh_required,
+                             vapor_pressure_kpa, sg):
+    """Diagnosa hidrolik untuk N pompa sekaligus, tervektorisasi penuh.
+
+    Semua argumen array-like panjang N. Mereproduksi rule dan prioritas
+    diagnose_hydraulic_single_point (cavitation override dulu, lalu pattern)
+    dan mengembalikan dict of arrays: `diag_codes` (indeks HYD_DIAG_DECODE),
+    `confidence`, `severity_codes` (indeks SEVERITY_DECODE), `npsh_margin_m`,
+    dan `deviations` (N,3). Decode ke string dilakukan per pompa yang
+    dilaporkan saja, bukan untuk seluruh fleet.
+    """
+    suction_pressure_bar = np.asarray(suction_pressure_bar, dtype=np.float64)
+    vapor_pressure_kpa = np.asarray(vapor_pressure_kpa, dtype=np.float64)
+    sg = np.asarray(sg, dtype=np.float64)
+    npsh_required = np.asarray(npsh_required, dtype=np.float64)
+
+    patterns, devs = classify_hydraulic_performance_batch(
+        head_aktual, head_design, eff_aktual, eff_bep, flow_aktual, flow_design
+    )
+    head_dev, eff_dev, flow_dev = devs[:, 0], devs[:, 1], devs[:, 2]
+
+    p_suction_abs_kpa = (suction_pressure_bar + 1.013) * 100
+    npsha = np.where(sg > 0,
+                     (p_suction_abs_kpa - vapor_pressure_kpa) / np.where(sg > 0, sg * 9.81, 1), 0)
+    npsh_margin = npsha - npsh_required
+
+    cavitation = npsh_margin < 0.5
+    under = ~cavitation & (patterns == HYD_PATTERN_UNDER_PERFORMANCE)
+    over = ~cavitation & (patterns == HYD_PATTERN_OVER_RESISTANCE)
+    eff_drop = ~cavitation & (patterns == HYD_PATTERN_EFFICIENCY_DROP)
+    normal = ~cavitation & (patterns == HYD_PATTERN_NORMAL)
+
+    diag_codes = np.select([cavitation, under, over, eff_drop, normal],
+                           [1, 2, 3, 4, 0], default=5).astype(np.int8)
+    confidence = np.select(
+        [cavitation, under, over, eff_drop, normal],
+        [np.minimum(90, 70 + np.trunc((0.5 - npsh_margin) * 20)),
+         np.minimum(85, 60 + np.trunc(np.abs(head_dev) * 2)),
+         np.minimum(90, 70 + np.trunc(np.abs(head_dev))),
+         np.minimum(80, 65 + np.trunc(np.abs(eff_dev))),
+         95.0],
+        default=40.0
+    ).astype(np.int64)
+    severity_codes = np.select(
+        [cavitation & (npsh_margin < 0.3), cavitation,
+         under & (head_dev < -15), under,
+         over & (flow_dev < -30), over,
+         eff_drop & (eff_dev < -20), eff_drop,
+         normal],
+        [2, 1, 2, 1, 2, 1, 2, 1, 0],
+        default=1
+    ).astype(np.int8)
+
+    return {
+        "diag_codes": diag_codes,
+        "confidence": confidence,
+        "severity_codes": severity_codes,
+        "npsh_margin_m": npsh_margin,
+        "deviations": devs
+    }
 
 # ============================================================================
 # 🔥 FAULT PROPAGATION MAP GENERATOR (NEW FUNCTION)
@@ -721,20 +1222,23 @@ def generate_fault_propagation_map(mech_result, hyd_result, elec_result, temp_da
 # ============================================================================
 # CROSS-DOMAIN INTEGRATION LOGIC
 # ============================================================================
+@dataclass(slots=True)
+class SystemResult:
+    """Hasil agregasi lintas-domain: akses atribut slot-backed, tanpa
+    resize/hash dict per penulisan field."""
+    diagnosis: str = "Tidak Ada Korelasi Antar Domain Terdeteksi"
+    confidence: int = 0
+    severity: str = "Low"
+    location: str = "N/A"
+    domain_breakdown: dict = field(default_factory=dict)
+    correlation_notes: list = field(default_factory=list)
+    temperature_notes: list = field(default_factory=list)
+    affected_points: list = field(default_factory=list)
+
 def aggregate_cross_domain_diagnosis(mech_result, hyd_result, elec_result,
                                      shared_context, temp_data=None):
-    system_result = {
-        "diagnosis": "Tidak Ada Korelasi Antar Domain Terdeteksi",
-        "confidence": 0,
-        "severity": "Low",
-        "location": "N/A",
-        "domain_breakdown": {},
-        "correlation_notes": [],
-        "temperature_notes": [],
-        "affected_points": []
-    }
-    
-    system_result["domain_breakdown"] = {
+    system_result = SystemResult()
+    system_result.domain_breakdown = {
         "mechanical": mech_result,
         "hydraulic": hyd_result,
         "electrical": elec_result
@@ -746,29 +1250,43 @@ def aggregate_cross_domain_diagnosis(mech_result, hyd_result, elec_result,
     mech_sev = mech_result.get("severity", "Low")
     hyd_sev = hyd_result.get("severity", "Low")
     elec_sev = elec_result.get("severity", "Low")
+    # Ambil nilai daun yang dipakai berulang oleh aturan korelasi sekali saja,
+    # supaya tiap cabang tinggal membandingkan lokal (tanpa chain .get bersarang).
+    mech_diag = mech_result.get("diagnosis")
+    elec_diag = elec_result.get("diagnosis")
+    # ID integer dari produsen; fallback intern untuk dict hasil pihak lain.
+    mech_diag_id = mech_result.get("diagnosis_id")
+    if mech_diag_id is None:
+        mech_diag_id = _DIAG_IDS.get(mech_diag, DiagId.NONE)
+    elec_diag_id = elec_result.get("diagnosis_id")
+    if elec_diag_id is None:
+        elec_diag_id = _DIAG_IDS.get(elec_diag, DiagId.NONE)
+    mech_fault_id = mech_result.get("fault_id")
+    if mech_fault_id is None:
+        mech_fault_id = _FAULT_IDS.get(mech_fault, FaultId.NONE)
+    hyd_fault_id = hyd_result.get("fault_id")
+    if hyd_fault_id is None:
+        hyd_fault_id = _FAULT_IDS.get(hyd_fault, FaultId.NONE)
+    elec_fault_id = elec_result.get("fault_id")
+    if elec_fault_id is None:
+        elec_fault_id = _FAULT_IDS.get(elec_fault, FaultId.NONE)
+    head_dev = (hyd_result.get("details") or {}).get("deviations", {}).get("head_dev", 0)
+    current_unbalance = (elec_result.get("details") or {}).get("current_unbalance", 0)
     
-    system_result["affected_points"] = mech_result.get("champion_points", [])
-    
-    correlation_bonus = 0
-    correlated_faults = []
-    
-    if (elec_fault == "voltage" and
-        mech_result.get("diagnosis") in ["MISALIGNMENT", "LOOSENESS"] and
-        hyd_result.get("details", {}).get("deviations", {}).get("head_dev", 0) < -5):
-        correlation_bonus += 15
-        correlated_faults.append("Voltage unbalance → torque pulsation → hydraulic instability")
-        system_result["diagnosis"] = "Electrical-Mechanical-Hydraulic Coupled Fault"
-    
-    if (hyd_fault == "cavitation" and mech_fault == "wear" and
-        elec_result.get("details", {}).get("current_unbalance", 0) > 5):
-        correlation_bonus += 20
-        correlated_faults.append("Cavitation → impeller erosion → unbalance → current fluctuation")
-        system_result["diagnosis"] = "Cascading Failure: Cavitation Origin"
+    system_result.affected_points = mech_result.get("champion_points", [])
     
-    if (elec_result.get("diagnosis") == "OVER_LOAD" and hyd_fault == "efficiency"):
-        correlation_bonus += 10
-        correlated_faults.append("High electrical input + low hydraulic output → internal mechanical/hydraulic loss")
-        system_result["diagnosis"] = "Internal Loss Investigation Required"
+    bits = ((elec_fault_id == FaultId.VOLTAGE) * _P_ELEC_VOLTAGE
+            | bool(mech_diag_id & _MECH_MASK_ALIGN_LOOSE) * _P_MECH_ALIGN_LOOSE
+            | (head_dev < -5) * _P_HEAD_DEV_LT_NEG5
+            | (hyd_fault_id == FaultId.CAVITATION) * _P_HYD_CAVITATION
+            | (mech_fault_id == FaultId.WEAR) * _P_MECH_WEAR
+            | (current_unbalance > 5) * _P_CURR_UNB_GT5
+            | (elec_diag_id == DiagId.OVER_LOAD) * _P_ELEC_OVERLOAD
+            | (hyd_fault_id == FaultId.EFFICIENCY) * _P_HYD_EFFICIENCY)
+    correlation_bonus, rule_diagnosis, rule_notes = _rules_kernel(bits)
+    correlated_faults = list(rule_notes)
+    if rule_diagnosis is not None:
+        system_result.diagnosis = rule_diagnosis
     
     if temp_data:
         temp_adjustment, temp_notes = calculate_temperature_confidence_adjustment(
@@ -776,313 +1294,427 @@ def aggregate_cross_domain_diagnosis(mech_result, hyd_result, elec_result,
             diagnosis_consistent=(mech_fault is not None and mech_fault != "normal")
         )
         correlation_bonus += temp_adjustment
-        system_result["temperature_notes"] = temp_notes
+        system_result.temperature_notes = temp_notes
         
-        if temp_data.get("Pump_DE") and temp_data.get("Pump_NDE"):
-            if abs(temp_data["Pump_DE"] - temp_data["Pump_NDE"]) > BEARING_TEMP_LIMITS["delta_threshold"]:
-                correlated_faults.append(f"Pump DE-NDE ΔT >15°C → Localized fault on DE bearing")
+        p_de = temp_data.get("Pump_DE")
+        p_nde = temp_data.get("Pump_NDE")
+        m_de = temp_data.get("Motor_DE")
+        if p_de and p_nde:
+            if (p_de - p_nde) ** 2 > _DELTA_SQ:
+                correlated_faults.append(_NOTE_PUMP_DELTA)
         
-        if temp_data.get("Motor_DE") and temp_data.get("Pump_DE"):
-            if temp_data["Motor_DE"] > temp_data["Pump_DE"] + 10:
-                correlated_faults.append("Motor DE > Pump DE → Possible electrical origin")
-    
-    severities = [mech_sev, hyd_sev, elec_sev]
-    if "High" in severities:
-        system_result["severity"] = "High"
-    elif "Medium" in severities:
-        system_result["severity"] = "Medium"
-    else:
-        system_result["severity"] = "Low"
+        if m_de and p_de:
+            if m_de > p_de + 10:
+                correlated_faults.append(_NOTE_MOTOR_HOTTER)
+    
+    system_result.severity = SEVERITY_DECODE[
+        max(_SEV_RANK.get(s, 0) for s in (mech_sev, hyd_sev, elec_sev))]
     
     if temp_data:
-        for temp in temp_data.values():
-            if temp and temp > BEARING_TEMP_LIMITS["critical_min"]:
-                system_result["severity"] = "High"
-                correlated_faults.append("⚠️ Critical bearing temperature detected")
-                break
+        if any(t and t > _CRITICAL_MIN for t in temp_data.values()):
+            system_result.severity = "High"
+            correlated_faults.append(_NOTE_CRITICAL_TEMP)
     
     # SIMPLE AVERAGE CONFIDENCE (KEMBALI KE ORIGINAL - TANPA FUZZY)
-    confidences = [r.get("confidence", 0) for r in [mech_result, hyd_result, elec_result]
-                   if r.get("confidence", 0) > 0]
-    base_confidence = np.mean(confidences) if confidences else 0
-    system_result["confidence"] = min(95, int(base_confidence + correlation_bonus))
+    total = 0
+    n = 0
+    for r in (mech_result, hyd_result, elec_result):
+        c = r.get("confidence", 0)
+        if c > 0:
+            total += c
+            n += 1
+    system_result.confidence = min(95, (total // n if n else 0) + correlation_bonus)
     
-    system_result["correlation_notes"] = correlated_faults if correlated_faults else ["Tidak ada korelasi kuat antar domain terdeteksi"]
+    system_result.correlation_notes = correlated_faults if correlated_faults else ["Tidak ada korelasi kuat antar domain terdeteksi"]
     
     return system_result
 
+# Predikat atomik rule korelasi, dipack jadi bitset (bit ke-i = predikat ke-i).
+_P_ELEC_VOLTAGE = 1 << 0
+_P_MECH_ALIGN_LOOSE = 1 << 1
+_P_HEAD_DEV_LT_NEG5 = 1 << 2
+_P_HYD_CAVITATION = 1 << 3
+_P_MECH_WEAR = 1 << 4
+_P_CURR_UNB_GT5 = 1 << 5
+_P_ELEC_OVERLOAD = 1 << 6
+_P_HYD_EFFICIENCY = 1 << 7
+
+# Satu rule = (mask predikat yang wajib aktif, bonus, catatan, override
+# diagnosis). Menambah rule baru = satu entri tabel, tanpa cabang baru.
+_CORRELATION_RULES = (
+    (_P_ELEC_VOLTAGE | _P_MECH_ALIGN_LOOSE | _P_HEAD_DEV_LT_NEG5, 15,
+     "Voltage unbalance → torque pulsation → hydraulic instability",
+     "Electrical-Mechanical-Hydraulic Coupled Fault"),
+    (_P_HYD_CAVITATION | _P_MECH_WEAR | _P_CURR_UNB_GT5, 20,
+     "Cavitation → impeller erosion → unbalance → current fluctuation",
+     "Cascading Failure: Cavitation Origin"),
+    (_P_ELEC_OVERLOAD | _P_HYD_EFFICIENCY, 10,
+     "High electrical input + low hydraulic output → internal mechanical/hydraulic loss",
+     "Internal Loss Investigation Required"),
+)
+
+@functools.lru_cache(maxsize=4096)
+def _rules_kernel(bits):
+    """Evaluasi tabel rule korelasi dari bitset predikat terkuantisasi.
+
+    Rule cocok bila semua predikat yang diwajibkan mask-nya aktif
+    (`bits & mask == mask`); urutan tabel menentukan diagnosis pemenang
+    (entri terakhir yang cocok). Bitset-nya int kecil sehingga hasil
+    di-memoize — hit cache menggantikan seluruh evaluasi tabel.
+    Return (bonus, diagnosis_override_atau_None, tuple catatan).
+    """
+    bonus = 0
+    notes = []
+    diagnosis = None
+    for mask, rule_bonus, note, rule_diag in _CORRELATION_RULES:
+        if bits & mask == mask:
+            bonus += rule_bonus
+            notes.append(note)
+            diagnosis = rule_diag
+    return bonus, diagnosis, tuple(notes)
+
+# Decode table jalur fleet agregasi: kode int8 → diagnosis sistem, indeks 0-3.
+AGG_DIAG_DECODE = ("Tidak Ada Korelasi Antar Domain Terdeteksi",
+                   "Electrical-Mechanical-Hydraulic Coupled Fault",
+                   "Cascading Failure: Cavitation Origin",
+                   "Internal Loss Investigation Required")
+_AGG_MECH_FAULT_CODES = {"normal": 0, "high_freq": 1, "low_freq": 2, "wear": 3}
+_AGG_ELEC_FAULT_CODES = {"normal": 0, "voltage": 1, "current": 2, "load": 3}
+_AGG_HYD_FAULT_CODES = {ft: i for i, (_, ft) in enumerate(HYD_DIAG_DECODE)}
+_SEV_RANK = {"Low": 0, "Medium": 1, "High": 2}
+
+def aggregate_cross_domain_fleet(mech_results, hyd_results, elec_results,
+                                 temp_data_list=None):
+    """Agregasi lintas-domain untuk N pompa sekaligus, tervektorisasi.
+
+    Pre-pass Python meng-encode field string hasil per-domain ke kode int
+    kecil (layout structure-of-arrays), lalu inti numerik — bonus korelasi,
+    penyesuaian temperatur, resolusi severity, dan rata-rata confidence —
+    berjalan sebagai operasi array NumPy. Mengembalikan dict of arrays
+    (`diag_codes` indeks AGG_DIAG_DECODE, `confidence`, `severity_codes`
+    indeks SEVERITY_DECODE); catatan tekstual per pompa tetap lewat jalur
+    skalar aggregate_cross_domain_diagnosis bila dibutuhkan.
+    """
+    n = len(mech_results)
+    mech_fault = np.fromiter((_AGG_MECH_FAULT_CODES.get(r.get("fault_type"), 0)
+                              for r in mech_results), dtype=np.int8, count=n)
+    hyd_fault = np.fromiter((_AGG_HYD_FAULT_CODES.get(r.get("fault_type"), 5)
+                             for r in hyd_results), dtype=np.int8, count=n)
+    elec_fault = np.fromiter((_AGG_ELEC_FAULT_CODES.get(r.get("fault_type"), 0)
+                              for r in elec_results), dtype=np.int8, count=n)
+    mech_rule1 = np.fromiter((r.get("diagnosis") in ("MISALIGNMENT", "LOOSENESS")
+                              for r in mech_results), dtype=bool, count=n)
+    elec_overload = np.fromiter((r.get("diagnosis") == "OVER_LOAD"
+                                 for r in elec_results), dtype=bool, count=n)
+    head_dev = np.fromiter(((r.get("details") or {}).get("deviations", {}).get("head_dev", 0)
+                            for r in hyd_results), dtype=np.float64, count=n)
+    current_unbalance = np.fromiter(((r.get("details") or {}).get("current_unbalance", 0)
+                                     for r in elec_results), dtype=np.float64, count=n)
+    sev = np.empty((n, 3), dtype=np.int8)
+    conf = np.empty((n, 3), dtype=np.float64)
+    for j, results in enumerate((mech_results, hyd_results, elec_results)):
+        sev[:, j] = [_SEV_RANK.get(r.get("severity", "Low"), 0) for r in results]
+        conf[:, j] = [r.get("confidence", 0) for r in results]
+    temps = np.zeros((n, 4), dtype=np.float64)
+    if temp_data_list is not None:
+        for i, td in enumerate(temp_data_list):
+            if td:
+                temps[i] = [td.get(k) or 0
+                            for k in ("Pump_DE", "Pump_NDE", "Motor_DE", "Motor_NDE")]
+
+    r1 = (elec_fault == _AGG_ELEC_FAULT_CODES["voltage"]) & mech_rule1 & (head_dev < -5)
+    r2 = ((hyd_fault == _AGG_HYD_FAULT_CODES["cavitation"]) &
+          (mech_fault == _AGG_MECH_FAULT_CODES["wear"]) & (current_unbalance > 5))
+    r3 = elec_overload & (hyd_fault == _AGG_HYD_FAULT_CODES["efficiency"])
+    bonus = 15 * r1 + 20 * r2 + 10 * r3
+
+    valid = temps > 0
+    consistent = (mech_fault != _AGG_MECH_FAULT_CODES["normal"]).astype(np.int64)
+    status_idxs = np.searchsorted(_TEMP_THRESH_ARR, temps, side='right')
+    adj = np.where(valid, _TEMP_ADJ_LUT[status_idxs, consistent[:, None]], 0).sum(axis=1)
+    delta_thr = _DELTA_THRESHOLD
+    adj += 5 * (valid[:, 0] & valid[:, 1] & (np.abs(temps[:, 0] - temps[:, 1]) > delta_thr))
+    adj += 5 * (valid[:, 2] & valid[:, 3] & (np.abs(temps[:, 2] - temps[:, 3]) > delta_thr))
+    bonus = bonus + np.clip(adj, -10, 20)
+
+    severity_codes = sev.max(axis=1)
+    critical = (temps > _CRITICAL_MIN).any(axis=1)
+    severity_codes = np.where(critical, 2, severity_codes).astype(np.int8)
+
+    pos = conf > 0
+    cnt = pos.sum(axis=1)
+    base = np.where(cnt > 0,
+                    np.where(pos, conf, 0).sum(axis=1) / np.maximum(cnt, 1), 0)
+    confidence = np.minimum(95, np.trunc(base + bonus)).astype(np.int64)
+    diag_codes = np.select([r3, r2, r1], [3, 2, 1], default=0).astype(np.int8)
+
+    return {
+        "diag_codes": diag_codes,
+        "confidence": confidence,
+        "severity_codes": severity_codes
+    }
+
 # ============================================================================
 # REPORT GENERATION - CSV
 # ============================================================================
+_CSV_ZONE_EDGES = np.array([2.8, 4.5, 7.1])
+_CSV_ZONE_LABELS = np.array(["Zone_A", "Zone_B", "Zone_C", "Zone_D"])
+_CSV_POINT_FMT = "{},{:.2f},{:.3f},{:.3f},{:.3f},{},{}"
+# Bagian laporan yang bentuknya tetap: satu %-format per blok, bukan
+# serangkaian f-string per baris.
+_HEADER_TMPL = ("MULTI-DOMAIN PUMP DIAGNOSTIC REPORT - %s\n"
+                "Generated: %s\n"
+                "RPM: %s | 1x RPM: %.2f Hz\n"
+                "Standards: ISO 10816-3/7 (Mech) | API 610 (Hyd) | IEC 60034 (Elec)\n\n")
+_HYD_SECTION_TMPL = ("Fluid: %s | SG: %s\n"
+                     "Suction: %.2f bar | Discharge: %.2f bar\n"
+                     "Flow: %.1f m³/h | Power: %.1f kW\n"
+                     "Calculated Head: %.1f m | Efficiency: %.1f%%\n"
+                     "NPSH Margin: %.2f m\n"
+                     "Diagnosis: %s | Confidence: %s%% | Severity: %s\n\n")
+_ELEC_SECTION_TMPL = ("Voltage L1-L2: %.1fV | L2-L3: %.1fV | L3-L1: %.1fV\n"
+                      "Current L1: %.1fA | L2: %.1fA | L3: %.1fA\n"
+                      "Voltage Unbalance: %.2f%% | Current Unbalance: %.2f%%\n"
+                      "Load Estimate: %.1f%%\n"
+                      "Diagnosis: %s | Confidence: %s%% | Severity: %s\n\n")
+
+@functools.lru_cache(maxsize=512)
+def _format_temp_block(p_de, p_nde, m_de, m_nde):
+    """Blok temperatur laporan, deterministik terhadap empat pembacaan.
+
+    Snapshot sensor yang sama (dashboard re-render, fleet dengan sensor
+    bersama) tidak diformat ulang — hasilnya di-memoize per tuple suhu.
+    """
+    parts = ["=== BEARING TEMPERATURE ===\n",
+             f"Pump_DE: {'N/A' if p_de is None else p_de}°C | Pump_NDE: {'N/A' if p_nde is None else p_nde}°C\n",
+             f"Motor_DE: {'N/A' if m_de is None else m_de}°C | Motor_NDE: {'N/A' if m_nde is None else m_nde}°C\n"]
+    if p_de and p_nde:
+        parts.append(f"Pump ΔT (DE-NDE): {abs(p_de - p_nde):.1f}°C\n")
+    if m_de and m_nde:
+        parts.append(f"Motor ΔT (DE-NDE): {abs(m_de - m_nde):.1f}°C\n")
+    parts.append("\n")
+    return "".join(parts)
+
 def generate_unified_csv_report(machine_id, rpm, timestamp, mech_data, hyd_data,
                                 elec_data, integrated_result, temp_data=None):
-    lines = []
-    lines.append(f"MULTI-DOMAIN PUMP DIAGNOSTIC REPORT - {machine_id.upper()}")
-    lines.append(f"Generated: {timestamp}")
-    lines.append(f"RPM: {rpm} | 1x RPM: {rpm/60:.2f} Hz")
-    lines.append(f"Standards: ISO 10816-3/7 (Mech) | API 610 (Hyd) | IEC 60034 (Elec)")
-    lines.append("")
+    buf = io.StringIO()
+    _write_unified_report(buf, machine_id, rpm, timestamp, mech_data, hyd_data,
+                          elec_data, integrated_result, temp_data)
+    return buf.getvalue()
+
+def _write_unified_report(out, machine_id, rpm, timestamp, mech_data, hyd_data,
+                          elec_data, integrated_result, temp_data=None):
+    """Tulis laporan langsung ke objek file `out` (streaming).
+
+    Menghindari list perantara + join raksasa di akhir: setiap baris
+    ditulis sekali ke buffer/file tujuan, memangkas alokasi sementara
+    di jalur CSV kira-kira setengahnya.
+    """
+    w = out.write
+    w(_HEADER_TMPL % (machine_id.upper(), timestamp, rpm, rpm / 60))
     
     if temp_data:
-        lines.append("=== BEARING TEMPERATURE ===")
-        lines.append(f"Pump_DE: {temp_data.get('Pump_DE', 'N/A')}°C | Pump_NDE: {temp_data.get('Pump_NDE', 'N/A')}°C")
-        lines.append(f"Motor_DE: {temp_data.get('Motor_DE', 'N/A')}°C | Motor_NDE: {temp_data.get('Motor_NDE', 'N/A')}°C")
-        if temp_data.get('Pump_DE') and temp_data.get('Pump_NDE'):
-            lines.append(f"Pump ΔT (DE-NDE): {abs(temp_data['Pump_DE'] - temp_data['Pump_NDE']):.1f}°C")
-        if temp_data.get('Motor_DE') and temp_data.get('Motor_NDE'):
-            lines.append(f"Motor ΔT (DE-NDE): {abs(temp_data['Motor_DE'] - temp_data['Motor_NDE']):.1f}°C")
-        lines.append("")
-    
-    lines.append("=== MECHANICAL VIBRATION ===")
+        w(_format_temp_block(temp_data.get('Pump_DE'), temp_data.get('Pump_NDE'),
+                             temp_data.get('Motor_DE'), temp_data.get('Motor_NDE')))
+    
+    # Header seksi hanya ditulis bila ada isinya.
     if mech_data.get("points"):
-        lines.append("POINT,Overall_Vel(mm/s),Band1(g),Band2(g),Band3(g),Status,Diagnosis")
-        for point, data in mech_data["points"].items():
-            vel = data.get('velocity', 0)
-            bands = data.get('bands', {})
-            b1 = bands.get('Band1', 0)
-            b2 = bands.get('Band2', 0)
-            b3 = bands.get('Band3', 0)
-            point_diag = mech_data.get("point_diagnoses", {}).get(point, {})
-            point_fault = point_diag.get("fault_type", "normal")
-            
-            if vel > 7.1:
-                status = "Zone_D"
-            elif vel > 4.5:
-                status = "Zone_C"
-            elif vel > 2.8:
-                status = "Zone_B"
-            else:
-                status = "Zone_A"
-            lines.append(f"{point},{vel:.2f},{b1:.3f},{b2:.3f},{b3:.3f},{status},{point_fault}")
-        lines.append(f"System Diagnosis: {mech_data.get('system_diagnosis', 'N/A')}")
+        w("=== MECHANICAL VIBRATION ===\n")
+        w("POINT,Overall_Vel(mm/s),Band1(g),Band2(g),Band3(g),Status,Diagnosis\n")
+        points = list(mech_data["points"].items())
+        vels = np.fromiter((d.get('velocity', 0) for _, d in points), dtype=np.float64,
+                           count=len(points))
+        # searchsorted side='left' mereproduksi ladder "vel > 7.1 / 4.5 / 2.8"
+        # (nilai tepat di batas tetap jatuh ke zona bawah) untuk semua titik sekaligus.
+        zones = _CSV_ZONE_LABELS[np.searchsorted(_CSV_ZONE_EDGES, vels)]
+        point_diagnoses = mech_data.get("point_diagnoses", {})
+        if len(points) <= 8:
+            # Untuk titik sedikit, overhead DataFrame mendominasi — tetap
+            # lewat jalur format/join skalar.
+            rows = [(point, vel,
+                     data.get('bands', {}).get('Band1', 0),
+                     data.get('bands', {}).get('Band2', 0),
+                     data.get('bands', {}).get('Band3', 0),
+                     status,
+                     point_diagnoses.get(point, {}).get("fault_type", "normal"))
+                    for (point, data), vel, status in zip(points, vels, zones)]
+            w("\n".join(_CSV_POINT_FMT.format(*row) for row in rows))
+            w("\n")
+        else:
+            # N besar: dorong formatting per titik ke C-code pandas/NumPy.
+            bands = np.array([[d.get('bands', {}).get(b, 0)
+                               for b in ('Band1', 'Band2', 'Band3')]
+                              for _, d in points], dtype=np.float64)
+            df = pd.DataFrame({
+                "point": [p for p, _ in points],
+                "vel": np.char.mod("%.2f", vels),
+                "b1": bands[:, 0],
+                "b2": bands[:, 1],
+                "b3": bands[:, 2],
+                "status": zones,
+                "fault": [point_diagnoses.get(p, {}).get("fault_type", "normal")
+                          for p, _ in points],
+            })
+            df.to_csv(out, header=False, index=False, float_format="%.3f",
+                      lineterminator="\n")
+        w(f"System Diagnosis: {mech_data.get('system_diagnosis', 'N/A')}\n")
         champion_points = mech_data.get('champion_points', [])
         if isinstance(champion_points, list):
-            lines.append(f"Champion Points: {', '.join(champion_points)}")
+            w(f"Champion Points: {', '.join(champion_points)}\n")
         else:
-            lines.append(f"Champion Point: {champion_points}")
-        lines.append("")
+            w(f"Champion Point: {champion_points}\n")
+        w("\n")
     
-    lines.append("=== HYDRAULIC PERFORMANCE ===")
     if hyd_data.get("measurements"):
+        w("=== HYDRAULIC PERFORMANCE ===\n")
         m = hyd_data["measurements"]
-        lines.append(f"Fluid: {hyd_data.get('fluid_type', 'N/A')} | SG: {hyd_data.get('sg', 'N/A')}")
-        lines.append(f"Suction: {m.get('suction_pressure', 0):.2f} bar | Discharge: {m.get('discharge_pressure', 0):.2f} bar")
-        lines.append(f"Flow: {m.get('flow_rate', 0):.1f} m³/h | Power: {m.get('motor_power', 0):.1f} kW")
-        lines.append(f"Calculated Head: {hyd_data.get('head_m', 0):.1f} m | Efficiency: {hyd_data.get('efficiency_percent', 0):.1f}%")
-        lines.append(f"NPSH Margin: {hyd_data.get('npsh_margin_m', 0):.2f} m")
-        lines.append(f"Diagnosis: {hyd_data.get('diagnosis', 'N/A')} | Confidence: {hyd_data.get('confidence', 0)}% | Severity: {hyd_data.get('severity', 'N/A')}")
-        lines.append("")
-    
-    lines.append("=== ELECTRICAL CONDITION ===")
+        w(_HYD_SECTION_TMPL % (
+            hyd_data.get('fluid_type', 'N/A'), hyd_data.get('sg', 'N/A'),
+            m.get('suction_pressure', 0), m.get('discharge_pressure', 0),
+            m.get('flow_rate', 0), m.get('motor_power', 0),
+            hyd_data.get('head_m', 0), hyd_data.get('efficiency_percent', 0),
+            hyd_data.get('npsh_margin_m', 0),
+            hyd_data.get('diagnosis', 'N/A'), hyd_data.get('confidence', 0),
+            hyd_data.get('severity', 'N/A')))
+    
     if elec_data.get("measurements"):
+        w("=== ELECTRICAL CONDITION ===\n")
         e = elec_data["measurements"]
-        lines.append(f"Voltage L1-L2: {e.get('v_l1l2', 0):.1f}V | L2-L3: {e.get('v_l2l3', 0):.1f}V | L3-L1: {e.get('v_l3l1', 0):.1f}V")
-        lines.append(f"Current L1: {e.get('i_l1', 0):.1f}A | L2: {e.get('i_l2', 0):.1f}A | L3: {e.get('i_l3', 0):.1f}A")
-        lines.append(f"Voltage Unbalance: {elec_data.get('voltage_unbalance', 0):.2f}% | Current Unbalance: {elec_data.get('current_unbalance', 0):.2f}%")
-        lines.append(f"Load Estimate: {elec_data.get('load_estimate', 0):.1f}%")
-        lines.append(f"Diagnosis: {elec_data.get('diagnosis', 'N/A')} | Confidence: {elec_data.get('confidence', 0)}% | Severity: {elec_data.get('severity', 'N/A')}")
-        lines.append("")
-    
-    lines.append("=== INTEGRATED DIAGNOSIS ===")
-    lines.append(f"Overall Diagnosis: {integrated_result.get('diagnosis', 'N/A')}")
-    lines.append(f"Overall Confidence: {integrated_result.get('confidence', 0)}%")
-    lines.append(f"Overall Severity: {integrated_result.get('severity', 'N/A')}")
-    lines.append(f"Affected Points: {', '.join(integrated_result.get('affected_points', []))}")
-    lines.append(f"Correlation Notes: {'; '.join(integrated_result.get('correlation_notes', []))}")
-    if integrated_result.get("temperature_notes"):
-        lines.append(f"Temperature Notes: {'; '.join(integrated_result['temperature_notes'])}")
-    lines.append("")
+        w(_ELEC_SECTION_TMPL % (
+            e.get('v_l1l2', 0), e.get('v_l2l3', 0), e.get('v_l3l1', 0),
+            e.get('i_l1', 0), e.get('i_l2', 0), e.get('i_l3', 0),
+            elec_data.get('voltage_unbalance', 0), elec_data.get('current_unbalance', 0),
+            elec_data.get('load_estimate', 0),
+            elec_data.get('diagnosis', 'N/A'), elec_data.get('confidence', 0),
+            elec_data.get('severity', 'N/A')))
+    
+    w("=== INTEGRATED DIAGNOSIS ===\n")
+    w(f"Overall Diagnosis: {integrated_result.diagnosis}\n")
+    w(f"Overall Confidence: {integrated_result.confidence}%\n")
+    w(f"Overall Severity: {integrated_result.severity}\n")
+    w(f"Affected Points: {', '.join(integrated_result.affected_points)}\n")
+    w(f"Correlation Notes: {'; '.join(integrated_result.correlation_notes)}\n")
+    if integrated_result.temperature_notes:
+        w(f"Temperature Notes: {'; '.join(integrated_result.temperature_notes)}\n")
+    w("\n")
     
     # FAULT PROPAGATION MAP (NEW - ADDED TO CSV)
-    lines.append("=== FAULT PROPAGATION MAP FOR REPAIR ===")
-    mech_result = integrated_result.get("domain_breakdown", {}).get("mechanical", {})
-    hyd_result = integrated_result.get("domain_breakdown", {}).get("hydraulic", {})
-    elec_result = integrated_result.get("domain_breakdown", {}).get("electrical", {})
+    w("=== FAULT PROPAGATION MAP FOR REPAIR ===\n")
+    breakdown = integrated_result.domain_breakdown
+    mech_result = breakdown.get("mechanical", {})
+    hyd_result = breakdown.get("hydraulic", {})
+    elec_result = breakdown.get("electrical", {})
     propagation_map = generate_fault_propagation_map(mech_result, hyd_result, elec_result, temp_data)
     
     for idx, prop in enumerate(propagation_map, 1):
-        lines.append(f"\nScenario {idx}: {prop['root_cause']}")
-        lines.append(f"Priority: {prop['priority']} | Timeline: {prop['timeline']}")
-        lines.append(f"Fault Chain: {' → '.join(prop['fault_chain'])}")
-        lines.append("Repair Actions:")
+        w(f"\nScenario {idx}: {prop['root_cause']}\n")
+        w(f"Priority: {prop['priority']} | Timeline: {prop['timeline']}\n")
+        w(f"Fault Chain: {' → '.join(prop['fault_chain'])}\n")
+        w("Repair Actions:\n")
         for action in prop["repair_actions"]:
-            lines.append(f"  - {action}")
-    lines.append("")
-    
-    return "\n".join(lines)
+            w(f"  - {action}\n")
 
 # ============================================================================
 # STREAMLIT UI - MAIN APPLICATION
 # ============================================================================
-def main():
-    st.set_page_config(
-        page_title="Pump Diagnostic Expert System",
-        page_icon="🔧",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
+# Streamlit menjalankan ulang seluruh script pada tiap interaksi widget;
+# wrapper @st.cache_data di bawah memutus evaluasi ulang pipeline diagnosa
+# selama nilai argumennya tidak berubah (bounded, kadaluarsa 10 menit).
+@st.cache_data(ttl="10m", max_entries=128, show_spinner=False)
+def _cached_diagnose_mechanical(vel_data, bands_data, fft_data_dict, rpm_hz, temp_data):
+    return diagnose_mechanical_system(vel_data, bands_data, fft_data_dict, rpm_hz, temp_data)
+
+@st.cache_data(ttl="10m", max_entries=128, show_spinner=False)
+def _cached_calculate_hydraulic(suction_pressure, discharge_pressure, flow_rate,
+                                motor_power, sg):
+    return calculate_hydraulic_parameters(suction_pressure, discharge_pressure,
+                                          flow_rate, motor_power, sg)
+
+@st.cache_data(ttl="10m", max_entries=128, show_spinner=False)
+def _cached_diagnose_hydraulic(hydraulic_calc, design_params, fluid_props, context):
+    return diagnose_hydraulic_single_point(hydraulic_calc, design_params,
+                                           fluid_props, context)
+
+@st.cache_data(ttl="10m", max_entries=128, show_spinner=False)
+def _cached_calculate_electrical(v_l1l2, v_l2l3, v_l3l1, i_l1, i_l2, i_l3,
+                                 rated_voltage, fla):
+    return calculate_electrical_parameters(v_l1l2, v_l2l3, v_l3l1, i_l1, i_l2, i_l3,
+                                           rated_voltage, fla)
+
+@st.cache_data(ttl="10m", max_entries=128, show_spinner=False)
+def _cached_diagnose_electrical(electrical_calc, motor_specs):
+    return diagnose_electrical_condition(electrical_calc, motor_specs)
+
+@st.cache_data(ttl="5m", max_entries=16, show_spinner=False)
+def _cached_csv_report(machine_id, rpm, timestamp, mech_data, hyd_data,
+                       elec_data, integrated_result, temp_data):
+    return generate_unified_csv_report(machine_id, rpm, timestamp, mech_data,
+                                       hyd_data, elec_data, integrated_result,
+                                       temp_data)
+
+# Hasil per-domain berupa dict bersarang; di-hash via JSON kanonik supaya
+# navigasi antar tab dengan hasil tak berubah tidak mengulang agregasi.
+@st.cache_data(max_entries=32, show_spinner=False,
+               hash_funcs={dict: lambda d: json.dumps(d, sort_keys=True,
+                                                      default=str)})
+def _cached_aggregate(mech_result, hyd_result, elec_result, shared_context,
+                      temp_data):
+    return aggregate_cross_domain_diagnosis(mech_result, hyd_result,
+                                            elec_result, shared_context,
+                                            temp_data)
+
+
+@st.fragment
+def _mech_input_fragment(rpm):
+    """Input mekanikal (suhu bearing + 12 titik vibrasi + FFT) dalam fragment.
+
+    Interaksi widget di sini hanya merender ulang blok ini; rerun seluruh
+    app baru dipicu lewat st.rerun(scope="app") setelah submit agar sidebar
+    dan tab Integrated ikut ter-update.
+    """
+    with st.form("mech_form"):
+        st.subheader("🌡️ Bearing Temperature (4 Points)")
+        temp_cols = st.columns(4)
+        temp_data = {}
+        for col, (label, default, key, tag) in zip(temp_cols, _TEMP_SPECS):
+            with col:
+                temp_data[tag] = st.number_input(label, min_value=0, max_value=150,
+                                                 value=default, step=1, key=key)
     
-    if "shared_context" not in st.session_state:
-        st.session_state.shared_context = {
-            "machine_id": "P-101",
-            "rpm": 2950,
-            "service_criticality": "Essential (Utility)",
-            "fluid_type": "Diesel / Solar",
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        st.divider()
+        st.subheader("📊 Input Data 12 Titik Pengukuran")
     
-    st.markdown("""
-    <div style="background-color:#1E3A5F; padding:15px; border-radius:8px; margin-bottom:20px">
-    <h2 style="color:white; margin:0">🔧💧⚡ Pump Diagnostic Expert System</h2>
-    <p style="color:#E0E0E0; margin:5px 0 0 0">
-    Integrated Mechanical • Hydraulic • Electrical Analysis | Pertamina Patra Niaga
-    </p>
-    </div>
-    """, unsafe_allow_html=True)
+        input_data = {}
+        bands_inputs = {}
+        zone_b_limit = ISO_LIMITS_VELOCITY["Zone B (Acceptable)"]
+
+        cols = st.columns(3)
+        for idx, point in enumerate(POINTS):
+            with cols[idx % 3]:
+                with st.expander(f"📍 {point}", expanded=False):
+                    overall = st.number_input("Overall Vel (mm/s)", min_value=0.0, max_value=30.0,
+                                              value=1.0, step=0.1, format="%.2f",
+                                              key=_KEYS_VEL[idx])
+                    input_data[point] = overall
+
+                    st.caption("Freq Bands (g) - Bearing")
+                    b1 = st.number_input("Band 1", min_value=0.0, value=0.2, step=0.05,
+                                         format="%.2f", key=_KEYS_B1[idx])
+                    b2 = st.number_input("Band 2", min_value=0.0, value=0.15, step=0.05,
+                                         format="%.2f", key=_KEYS_B2[idx])
+                    b3 = st.number_input("Band 3", min_value=0.0, value=0.1, step=0.05,
+                                         format="%.2f", key=_KEYS_B3[idx])
+                    bands_inputs[point] = {"Band1": b1, "Band2": b2, "Band3": b3}
+
+                    if overall > zone_b_limit:
+                        st.error(f"⚠️ {overall} mm/s (High)")
+
+        # Deteksi titik bermasalah sekali jalan lewat boolean mask NumPy,
+        # bukan scan dict per titik pada tiap rerun.
+        vels = np.fromiter(input_data.values(), dtype=np.float32,
+                           count=len(POINTS))
+        problematic_points = [POINTS[i] for i in np.where(vels > zone_b_limit)[0]]
     
-    with st.sidebar:
-        st.subheader("📍 Shared Context")
-        machine_id = st.text_input("Machine ID / Tag", value=st.session_state.shared_context["machine_id"])
-        rpm = st.number_input("Operating RPM", min_value=600, max_value=3600,
-                              value=st.session_state.shared_context["rpm"], step=10)
-        service_type = st.selectbox("Service Criticality",
-                                    ["Critical (Process)", "Essential (Utility)", "Standby"],
-                                    index=["Critical (Process)", "Essential (Utility)", "Standby"].index(
-                                        st.session_state.shared_context["service_criticality"]))
-        fluid_type = st.selectbox("Fluid Type (BBM)",
-                                  list(FLUID_PROPERTIES.keys()),
-                                  index=list(FLUID_PROPERTIES.keys()).index(
-                                      st.session_state.shared_context["fluid_type"]))
-        
-        st.session_state.shared_context.update({
-            "machine_id": machine_id,
-            "rpm": rpm,
-            "service_criticality": service_type,
-            "fluid_type": fluid_type
-        })
-        
-        fluid_props = FLUID_PROPERTIES[fluid_type]
-        st.info(f"""
-        **Fluid Properties ({fluid_type}):**
-        - SG: {fluid_props['sg']}
-        - Vapor Pressure @38°C: {fluid_props['vapor_pressure_kpa_38C']} kPa
-        - Risk Level: {fluid_props['risk_level']}
-        """)
-        
-        st.divider()
-        st.subheader("🧭 Navigasi")
-        st.markdown("""
-        - 🔧 **Mechanical**: Vibration analysis
-        - 💧 **Hydraulic**: Performance troubleshooting
-        - ⚡ **Electrical**: 3-phase condition monitoring
-        - 🔗 **Integrated**: Cross-domain correlation
-        """)
-        
-        st.divider()
-        st.caption("📊 Status Analisis:")
-        col_s1, col_s2 = st.columns(2)
-        with col_s1:
-            mech_done = "✅" if "mech_result" in st.session_state else "⏳"
-            st.write(f"{mech_done} Mechanical")
-        with col_s2:
-            hyd_done = "✅" if "hyd_result" in st.session_state else "⏳"
-            st.write(f"{hyd_done} Hydraulic")
-        col_s3, col_s4 = st.columns(2)
-        with col_s3:
-            elec_done = "✅" if "elec_result" in st.session_state else "⏳"
-            st.write(f"{elec_done} Electrical")
-        with col_s4:
-            int_done = "✅" if "integrated_result" in st.session_state else "⏳"
-            st.write(f"{int_done} Integrated")
-    
-    tab_mech, tab_hyd, tab_elec, tab_integrated = st.tabs([
-        "🔧 Mechanical", "💧 Hydraulic", "⚡ Electrical", "🔗 Integrated Summary"
-    ])
-    
-    # TAB 1: MECHANICAL
-    with tab_mech:
-        st.header("🔧 Mechanical Vibration Analysis")
-        st.caption("ISO 10816-3/7 | Centrifugal Pump + Electric Motor")
-        
-        st.subheader("🌡️ Bearing Temperature (4 Points)")
-        temp_cols = st.columns(4)
-        temp_data = {}
-        
-        with temp_cols[0]:
-            pump_de_temp = st.number_input("Pump DE (°C)", min_value=0, max_value=150,
-                                           value=65, step=1, key="temp_pump_de")
-            temp_data["Pump_DE"] = pump_de_temp
-            if pump_de_temp > BEARING_TEMP_LIMITS["warning_min"]:
-                st.error(f"🔴 {pump_de_temp}°C - Warning")
-            elif pump_de_temp > BEARING_TEMP_LIMITS["elevated_min"]:
-                st.warning(f"🟡 {pump_de_temp}°C - Elevated")
-            else:
-                st.success(f"🟢 {pump_de_temp}°C - Normal")
-        
-        with temp_cols[1]:
-            pump_nde_temp = st.number_input("Pump NDE (°C)", min_value=0, max_value=150,
-                                            value=63, step=1, key="temp_pump_nde")
-            temp_data["Pump_NDE"] = pump_nde_temp
-            if pump_nde_temp > BEARING_TEMP_LIMITS["warning_min"]:
-                st.error(f"🔴 {pump_nde_temp}°C - Warning")
-            elif pump_nde_temp > BEARING_TEMP_LIMITS["elevated_min"]:
-                st.warning(f"🟡 {pump_nde_temp}°C - Elevated")
-            else:
-                st.success(f"🟢 {pump_nde_temp}°C - Normal")
-        
-        with temp_cols[2]:
-            motor_de_temp = st.number_input("Motor DE (°C)", min_value=0, max_value=150,
-                                            value=68, step=1, key="temp_motor_de")
-            temp_data["Motor_DE"] = motor_de_temp
-            if motor_de_temp > BEARING_TEMP_LIMITS["warning_min"]:
-                st.error(f"🔴 {motor_de_temp}°C - Warning")
-            elif motor_de_temp > BEARING_TEMP_LIMITS["elevated_min"]:
-                st.warning(f"🟡 {motor_de_temp}°C - Elevated")
-            else:
-                st.success(f"🟢 {motor_de_temp}°C - Normal")
-        
-        with temp_cols[3]:
-            motor_nde_temp = st.number_input("Motor NDE (°C)", min_value=0, max_value=150,
-                                             value=66, step=1, key="temp_motor_nde")
-            temp_data["Motor_NDE"] = motor_nde_temp
-            if motor_nde_temp > BEARING_TEMP_LIMITS["warning_min"]:
-                st.error(f"🔴 {motor_nde_temp}°C - Warning")
-            elif motor_nde_temp > BEARING_TEMP_LIMITS["elevated_min"]:
-                st.warning(f"🟡 {motor_nde_temp}°C - Elevated")
-            else:
-                st.success(f"🟢 {motor_nde_temp}°C - Normal")
-        
-        st.divider()
-        st.subheader("📊 Input Data 12 Titik Pengukuran")
-        
-        points = [f"{machine} {end} {direction}"
-                  for machine in ["Pump", "Motor"]
-                  for end in ["DE", "NDE"]
-                  for direction in ["Horizontal", "Vertical", "Axial"]]
-        
-        input_data = {}
-        bands_inputs = {}
-        
-        cols = st.columns(3)
-        for idx, point in enumerate(points):
-            with cols[idx % 3]:
-                with st.expander(f"📍 {point}", expanded=False):
-                    overall = st.number_input("Overall Vel (mm/s)", min_value=0.0, max_value=30.0,
-                                              value=1.0, step=0.1, key=f"mech_vel_{point}")
-                    input_data[point] = overall
-                    
-                    st.caption("Freq Bands (g) - Bearing")
-                    b1 = st.number_input("Band 1", min_value=0.0, value=0.2, step=0.05, key=f"m_b1_{point}")
-                    b2 = st.number_input("Band 2", min_value=0.0, value=0.15, step=0.05, key=f"m_b2_{point}")
-                    b3 = st.number_input("Band 3", min_value=0.0, value=0.1, step=0.05, key=f"m_b3_{point}")
-                    bands_inputs[point] = {"Band1": b1, "Band2": b2, "Band3": b3}
-                    
-                    if overall > ISO_LIMITS_VELOCITY["Zone B (Acceptable)"]:
-                        st.error(f"⚠️ {overall} mm/s (High)")
-        
-        problematic_points = [p for p, v in input_data.items() 
-                             if v > ISO_LIMITS_VELOCITY["Zone B (Acceptable)"]]
-        
         if problematic_points:
             st.markdown(f"""
             <div style="background-color:#ffeeba; padding:15px; border-radius:8px; border-left:5px solid #ffc107; margin-top:20px;">
@@ -1093,11 +1725,11 @@ def main():
             </p>
             </div>
             """, unsafe_allow_html=True)
-            
+        
             fft_data_dict = {}
+            rpm_hz = rpm / 60
             for point in problematic_points:
                 with st.expander(f"📈 Input FFT Spectrum untuk: {point}", expanded=True):
-                    rpm_hz = rpm / 60
                     point_fft_peaks = []
                     for i in range(1, 4):
                         c1, c2 = st.columns(2)
@@ -1111,81 +1743,63 @@ def main():
                         point_fft_peaks.append((freq, amp))
                     fft_data_dict[point] = point_fft_peaks
         else:
-            rpm_hz = rpm / 60
-            fft_data_dict = {p: [(rpm_hz, 0.1), (2*rpm_hz, 0.05)] for p in points}
-            st.success("✅ Semua titik vibrasi dalam batas normal.")
-        
-        if st.button("🔍 Jalankan Mechanical Analysis", type="primary", key="run_mech"):
-            with st.spinner("Menganalisis pola getaran..."):
-                mech_system = diagnose_mechanical_system(
-                    input_data, bands_inputs, fft_data_dict, rpm/60, temp_data
-                )
-                st.session_state.mech_result = mech_system
-                st.session_state.mech_data = {
-                    "points": {p: {"velocity": input_data[p], "bands": bands_inputs[p]} for p in points},
-                    "point_diagnoses": mech_system["point_diagnoses"],
-                    "system_diagnosis": mech_system["diagnosis"],
-                    "champion_points": mech_system["champion_points"]
+            # Spektrum default hanya dibangun ulang bila RPM berubah; di
+            # jalur normal tiap rerun cukup memakai dict dari session_state.
+            if st.session_state.get("_fft_default_rpm") != rpm:
+                rpm_hz = rpm / 60
+                st.session_state["_fft_defaults"] = {
+                    p: [(rpm_hz, 0.1), (2 * rpm_hz, 0.05)] for p in POINTS
                 }
-                st.session_state.temp_data = temp_data
-                st.success(f"✅ Analisis Selesai: {mech_system['diagnosis']}")
-        
-        if "mech_result" in st.session_state:
-            result = st.session_state.mech_result
-            
-            champion_points = result.get("champion_points", [])
-            if isinstance(champion_points, list):
-                points_display = ", ".join(champion_points)
-            else:
-                points_display = champion_points
-            
-            col_a, col_b, col_c = st.columns(3)
-            with col_a:
-                st.metric("Diagnosis Utama", result["diagnosis"])
-            with col_b:
-                st.metric("Titik Sumber", points_display)
-            with col_c:
-                st.metric("Severity", {"Low":"🟢","Medium":"🟠","High":"🔴"}.get(result["severity"],"⚪"))
-            
-            if result["diagnosis"] != "Normal":
-                st.info(get_mechanical_recommendation(result["diagnosis"], points_display, result["severity"]))
-                
-                st.subheader("📋 Diagnosis Per Titik")
-                point_df_data = []
-                for point, diag in result.get("point_diagnoses", {}).items():
-                    point_df_data.append({
-                        "Titik": point,
-                        "Velocity (mm/s)": diag.get("velocity", 0),
-                        "Fault Type": diag.get("fault_type", "normal"),
-                        "Severity": diag.get("severity", "Low")
-                    })
-                point_df = pd.DataFrame(point_df_data)
-                st.dataframe(point_df, use_container_width=True)
+                st.session_state["_fft_default_rpm"] = rpm
+            fft_data_dict = st.session_state["_fft_defaults"]
+            st.success("✅ Semua titik vibrasi dalam batas normal.")
     
-    # TAB 2: HYDRAULIC
-    with tab_hyd:
-        st.header("💧 Hydraulic Troubleshooting")
-        st.caption("Single-Point Steady-State Measurement")
-        
-        def estimate_bep_efficiency(Q, H, P_motor, SG, motor_eff=0.90):
-            P_hyd_design = (Q * H * SG * 9.81) / 3600
-            P_shaft_est = P_motor * motor_eff
-            if P_shaft_est > 0 and P_hyd_design > 0:
-                eff = (P_hyd_design / P_shaft_est) * 100
-                return min(90, max(50, eff))
-            return 75
-        
-        def estimate_npshr_conservative(Q_m3h):
-            if Q_m3h < 50:
-                return 3.0
-            elif Q_m3h < 200:
-                return 4.0
-            else:
-                return 5.5
-        
+        run_mech = st.form_submit_button("🔍 Jalankan Mechanical Analysis",
+                                         type="primary")
+
+    # Status suhu dirender di luar form: cukup diperbarui saat submit,
+    # tidak perlu rerun per keystroke.
+    status_cols = st.columns(4)
+    for col, temp_value in zip(status_cols, temp_data.values()):
+        with col:
+            render, icon, label = _classify_temp(temp_value)
+            render(f"{icon} {temp_value}°C - {label}")
+
+    if run_mech:
+        with st.spinner("Menganalisis pola getaran..."):
+            mech_system = _cached_diagnose_mechanical(
+                input_data, bands_inputs, fft_data_dict, rpm/60, temp_data
+            )
+            st.session_state.mech_result = mech_system
+            st.session_state._status["mech"] = True
+            # Hasil domain baru membuat diagnosa terintegrasi lama basi.
+            st.session_state._status["integrated"] = False
+            st.session_state.pop("integrated_result", None)
+            st.session_state.mech_data = {
+                "points": {p: {"velocity": input_data[p], "bands": bands_inputs[p]} for p in POINTS},
+                "point_diagnoses": mech_system["point_diagnoses"],
+                "system_diagnosis": mech_system["diagnosis"],
+                "champion_points": mech_system["champion_points"]
+            }
+            st.session_state.temp_data = temp_data
+            st.success(f"✅ Analisis Selesai: {mech_system['diagnosis']}")
+        st.rerun(scope="app")
+
+@st.fragment
+def _hyd_input_fragment(fluid_type, fluid_props):
+    """Input hidrolik (data primer + nameplate) dalam fragment terisolasi."""
+    def estimate_bep_efficiency(Q, H, P_motor, SG, motor_eff=0.90):
+        P_hyd_design = (Q * H * SG * 9.81) / 3600
+        P_shaft_est = P_motor * motor_eff
+        if P_shaft_est > 0 and P_hyd_design > 0:
+            eff = (P_hyd_design / P_shaft_est) * 100
+            return min(90, max(50, eff))
+        return 75
+    
+    with st.form("hyd_form"):
         st.subheader("📊 Data Primer Hidrolik")
         col1, col2, col3 = st.columns(3)
-        
+    
         with col1:
             suction_pressure = st.number_input("Suction Pressure [bar]", min_value=-1.0,
                                                value=0.44, step=0.01, key="suction_p")
@@ -1193,18 +1807,18 @@ def main():
                                                  value=3.73, step=0.01, key="discharge_p")
             delta_p = discharge_pressure - suction_pressure
             st.metric("ΔP", f"{delta_p:.2f} bar")
-        
+    
         with col2:
             flow_rate = st.number_input("Flow Rate [m³/h]", min_value=0.0, value=100.0,
                                         step=1.0, key="flow_rate")
             motor_power = st.number_input("Motor Power [kW]", min_value=0.0,
                                           value=15.0, step=0.5, key="motor_power")
-        
+    
         with col3:
             fluid_props = FLUID_PROPERTIES[fluid_type]
             sg = st.number_input("Specific Gravity", min_value=0.5, max_value=1.5,
                                  value=fluid_props["sg"], step=0.01, key="sg_input")
-        
+    
         with st.expander("📋 Data Nameplate", expanded=True):
             col1, col2 = st.columns(2)
             with col1:
@@ -1219,7 +1833,7 @@ def main():
                 npsh_required = st.number_input("NPSH Required [m] (Optional)",
                                                 min_value=0.0, value=0.0, step=0.1,
                                                 key="npshr")
-        
+    
         estimation_notes = []
         if bep_efficiency <= 0:
             bep_efficiency = estimate_bep_efficiency(rated_flow, rated_head, motor_power, sg)
@@ -1227,70 +1841,63 @@ def main():
         if npsh_required <= 0:
             npsh_required = estimate_npshr_conservative(rated_flow)
             estimation_notes.append(f"NPSHr diestimasi: {npsh_required:.1f}m")
-        
+    
         if estimation_notes:
             st.info("🔧 **Auto-Estimation:** " + " | ".join(estimation_notes))
-        
+    
         analyze_hyd_disabled = suction_pressure >= discharge_pressure
-        
-        if st.button("💧 Generate Diagnosis", type="primary", key="run_hyd",
-                     disabled=analyze_hyd_disabled):
-            with st.spinner("Menganalisis performa hidrolik..."):
-                hyd_calc = calculate_hydraulic_parameters(
-                    suction_pressure, discharge_pressure, flow_rate,
-                    motor_power, sg
-                )
-                design_params = {
-                    "rated_flow_m3h": rated_flow,
-                    "rated_head_m": rated_head,
-                    "bep_efficiency": bep_efficiency,
-                    "npsh_required_m": npsh_required
-                }
-                context = {
-                    "flow_aktual": flow_rate,
-                    "suction_pressure_bar": suction_pressure
-                }
-                hyd_result = diagnose_hydraulic_single_point(
-                    hyd_calc, design_params, fluid_props, context
-                )
-                st.session_state.hyd_result = hyd_result
-                st.session_state.hyd_data = {
-                    "measurements": {
-                        "suction_pressure": suction_pressure,
-                        "discharge_pressure": discharge_pressure,
-                        "flow_rate": flow_rate,
-                        "motor_power": motor_power
-                    },
-                    "fluid_type": fluid_type,
-                    "sg": sg,
-                    "head_m": hyd_calc["head_m"],
-                    "efficiency_percent": hyd_calc["efficiency_percent"],
-                    "npsh_margin_m": hyd_result["details"].get("npsh_margin_m", 0),
-                    "diagnosis": hyd_result["diagnosis"],
-                    "confidence": hyd_result["confidence"],
-                    "severity": hyd_result["severity"],
-                    "estimation_note": " | ".join(estimation_notes) if estimation_notes else "Data OEM lengkap"
-                }
-                st.success(f"✅ {hyd_result['diagnosis']} ({hyd_result['confidence']}%)")
-        
-        if "hyd_result" in st.session_state:
-            result = st.session_state.hyd_result
-            col_a, col_b, col_c = st.columns(3)
-            with col_a:
-                st.metric("Diagnosis", result["diagnosis"])
-            with col_b:
-                st.metric("Severity", {"Low":"🟢","Medium":"🟠","High":"🔴"}.get(result["severity"],"⚪"))
-            with col_c:
-                st.metric("Domain", "Hydraulic")
-            
-            if result["diagnosis"] != "NORMAL_OPERATION":
-                st.info(get_hydraulic_recommendation(result["diagnosis"], fluid_type, result["severity"]))
     
-    # TAB 3: ELECTRICAL
-    with tab_elec:
-        st.header("⚡ Electrical Condition Analysis")
-        st.caption("3-Phase Voltage/Current | Unbalance Detection")
-        
+        run_hyd = st.form_submit_button("💧 Generate Diagnosis", type="primary",
+                                        disabled=analyze_hyd_disabled)
+
+    if run_hyd:
+        with st.spinner("Menganalisis performa hidrolik..."):
+            hyd_calc = _cached_calculate_hydraulic(
+                suction_pressure, discharge_pressure, flow_rate,
+                motor_power, sg
+            )
+            design_params = {
+                "rated_flow_m3h": rated_flow,
+                "rated_head_m": rated_head,
+                "bep_efficiency": bep_efficiency,
+                "npsh_required_m": npsh_required
+            }
+            context = {
+                "flow_aktual": flow_rate,
+                "suction_pressure_bar": suction_pressure
+            }
+            hyd_result = _cached_diagnose_hydraulic(
+                hyd_calc, design_params, dict(fluid_props), context
+            )
+            st.session_state.hyd_result = hyd_result
+            st.session_state._status["hyd"] = True
+            # Hasil domain baru membuat diagnosa terintegrasi lama basi.
+            st.session_state._status["integrated"] = False
+            st.session_state.pop("integrated_result", None)
+            st.session_state.hyd_data = {
+                "measurements": {
+                    "suction_pressure": suction_pressure,
+                    "discharge_pressure": discharge_pressure,
+                    "flow_rate": flow_rate,
+                    "motor_power": motor_power
+                },
+                "fluid_type": fluid_type,
+                "sg": sg,
+                "head_m": hyd_calc["head_m"],
+                "efficiency_percent": hyd_calc["efficiency_percent"],
+                "npsh_margin_m": hyd_result["details"].get("npsh_margin_m", 0),
+                "diagnosis": hyd_result["diagnosis"],
+                "confidence": hyd_result["confidence"],
+                "severity": hyd_result["severity"],
+                "estimation_note": " | ".join(estimation_notes) if estimation_notes else "Data OEM lengkap"
+            }
+            st.success(f"✅ {hyd_result['diagnosis']} ({hyd_result['confidence']}%)")
+        st.rerun(scope="app")
+
+@st.fragment
+def _elec_input_fragment():
+    """Input electrical (nameplate + pengukuran 3-phase) dalam fragment."""
+    with st.form("elec_form"):
         with st.expander("⚙️ Motor Nameplate", expanded=True):
             col1, col2 = st.columns(2)
             with col1:
@@ -1299,55 +1906,208 @@ def main():
             with col2:
                 fla = st.number_input("Full Load Amps - FLA (A)", min_value=10, max_value=500,
                                       value=85, step=5, key="rated_i")
-        
+    
         st.subheader("📊 Pengukuran 3-Phase")
         col1, col2 = st.columns(2)
-        
+    
         with col1:
             st.caption("Voltage (Line-to-Line)")
             v_l1l2 = st.number_input("L1-L2 (V)", min_value=0.0, value=400.0, step=1.0, key="v_l1l2")
             v_l2l3 = st.number_input("L2-L3 (V)", min_value=0.0, value=402.0, step=1.0, key="v_l2l3")
             v_l3l1 = st.number_input("L3-L1 (V)", min_value=0.0, value=398.0, step=1.0, key="v_l3l1")
-        
+    
         with col2:
             st.caption("Current (Per Phase)")
             i_l1 = st.number_input("L1 (A)", min_value=0.0, value=82.0, step=0.5, key="i_l1")
             i_l2 = st.number_input("L2 (A)", min_value=0.0, value=84.0, step=0.5, key="i_l2")
             i_l3 = st.number_input("L3 (A)", min_value=0.0, value=83.0, step=0.5, key="i_l3")
+    
+        run_elec = st.form_submit_button("⚡ Generate Electrical Diagnosis",
+                                         type="primary")
+
+    if run_elec:
+        with st.spinner("Menganalisis kondisi electrical..."):
+            elec_calc = _cached_calculate_electrical(
+                v_l1l2, v_l2l3, v_l3l1, i_l1, i_l2, i_l3,
+                rated_voltage, fla
+            )
+            motor_specs = {
+                "rated_voltage": rated_voltage,
+                "fla": fla
+            }
+            elec_result = _cached_diagnose_electrical(elec_calc, motor_specs)
+            st.session_state.elec_result = elec_result
+            st.session_state._status["elec"] = True
+            # Hasil domain baru membuat diagnosa terintegrasi lama basi.
+            st.session_state._status["integrated"] = False
+            st.session_state.pop("integrated_result", None)
+            st.session_state.elec_data = {
+                "measurements": {
+                    "v_l1l2": v_l1l2, "v_l2l3": v_l2l3, "v_l3l1": v_l3l1,
+                    "i_l1": i_l1, "i_l2": i_l2, "i_l3": i_l3
+                },
+                "voltage_unbalance": elec_calc["voltage_unbalance_percent"],
+                "current_unbalance": elec_calc["current_unbalance_percent"],
+                "load_estimate": elec_calc["load_estimate_percent"],
+                "diagnosis": elec_result["diagnosis"],
+                "confidence": elec_result["confidence"],
+                "severity": elec_result["severity"]
+            }
+            st.success(f"✅ {elec_result['diagnosis']} ({elec_result['confidence']}%)")
+        st.rerun(scope="app")
+
+def main():
+    st.set_page_config(
+        page_title="Pump Diagnostic Expert System",
+        page_icon="🔧",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    if "shared_context" not in st.session_state:
+        st.session_state.shared_context = {
+            "machine_id": "P-101",
+            "rpm": 2950,
+            "service_criticality": "Essential (Utility)",
+            "fluid_type": "Diesel / Solar",
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+    st.session_state.setdefault("_status", {"mech": False, "hyd": False,
+                                            "elec": False, "integrated": False})
+    
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
+    
+    status = st.session_state._status
+
+    with st.sidebar:
+        st.subheader("📍 Shared Context")
+        machine_id = st.text_input("Machine ID / Tag", value=st.session_state.shared_context["machine_id"])
+        rpm = st.number_input("Operating RPM", min_value=600, max_value=3600,
+                              value=st.session_state.shared_context["rpm"], step=10)
+        service_type = st.selectbox("Service Criticality",
+                                    _SERVICE_TYPES,
+                                    index=_SERVICE_TYPES.index(
+                                        st.session_state.shared_context["service_criticality"]))
+        fluid_type = st.selectbox("Fluid Type (BBM)",
+                                  _FLUID_KEYS,
+                                  index=_FLUID_KEYS.index(
+                                      st.session_state.shared_context["fluid_type"]))
         
-        if st.button("⚡ Generate Electrical Diagnosis", type="primary", key="run_elec"):
-            with st.spinner("Menganalisis kondisi electrical..."):
-                elec_calc = calculate_electrical_parameters(
-                    v_l1l2, v_l2l3, v_l3l1, i_l1, i_l2, i_l3,
-                    rated_voltage, fla
-                )
-                motor_specs = {
-                    "rated_voltage": rated_voltage,
-                    "fla": fla
-                }
-                elec_result = diagnose_electrical_condition(elec_calc, motor_specs)
-                st.session_state.elec_result = elec_result
-                st.session_state.elec_data = {
-                    "measurements": {
-                        "v_l1l2": v_l1l2, "v_l2l3": v_l2l3, "v_l3l1": v_l3l1,
-                        "i_l1": i_l1, "i_l2": i_l2, "i_l3": i_l3
-                    },
-                    "voltage_unbalance": elec_calc["voltage_unbalance_percent"],
-                    "current_unbalance": elec_calc["current_unbalance_percent"],
-                    "load_estimate": elec_calc["load_estimate_percent"],
-                    "diagnosis": elec_result["diagnosis"],
-                    "confidence": elec_result["confidence"],
-                    "severity": elec_result["severity"]
-                }
-                st.success(f"✅ {elec_result['diagnosis']} ({elec_result['confidence']}%)")
+        # Tulis shared_context hanya bila ada nilai yang benar-benar
+        # berubah; penulisan tanpa beda akan merusak hit cache diagnosa
+        # yang di-key pada context ini.
+        ctx = st.session_state.shared_context
+        new_ctx = {
+            "machine_id": machine_id,
+            "rpm": rpm,
+            "service_criticality": service_type,
+            "fluid_type": fluid_type
+        }
+        if any(ctx.get(k) != v for k, v in new_ctx.items()):
+            ctx.update(new_ctx)
+        
+        fluid_props = FLUID_PROPERTIES[fluid_type]
+        st.info(f"""
+        **Fluid Properties ({fluid_type}):**
+        - SG: {fluid_props['sg']}
+        - Vapor Pressure @38°C: {fluid_props['vapor_pressure_kpa_38C']} kPa
+        - Risk Level: {fluid_props['risk_level']}
+        """)
+        
+        st.divider()
+        st.subheader("🧭 Navigasi")
+        st.markdown("""
+        - 🔧 **Mechanical**: Vibration analysis
+        - 💧 **Hydraulic**: Performance troubleshooting
+        - ⚡ **Electrical**: 3-phase condition monitoring
+        - 🔗 **Integrated**: Cross-domain correlation
+        """)
+        
+        st.divider()
+        st.caption("📊 Status Analisis:")
+        status_cols = st.columns(4)
+        for col, (label, key) in zip(status_cols, _STATUS_FIELDS):
+            with col:
+                done = "✅" if status[key] else "⏳"
+                st.write(f"{done} {label}")
+    
+    tab_mech, tab_hyd, tab_elec, tab_integrated = st.tabs([
+        "🔧 Mechanical", "💧 Hydraulic", "⚡ Electrical", "🔗 Integrated Summary"
+    ])
+    
+    # TAB 1: MECHANICAL
+    with tab_mech:
+        st.header("🔧 Mechanical Vibration Analysis")
+        st.caption("ISO 10816-3/7 | Centrifugal Pump + Electric Motor")
         
-        if "elec_result" in st.session_state:
+        _mech_input_fragment(rpm)
+        
+        if status["mech"]:
+            result = st.session_state.mech_result
+            
+            champion_points = result.get("champion_points", [])
+            if isinstance(champion_points, list):
+                points_display = ", ".join(champion_points)
+            else:
+                points_display = champion_points
+            
+            col_a, col_b, col_c = st.columns(3)
+            with col_a:
+                st.metric("Diagnosis Utama", result["diagnosis"])
+            with col_b:
+                st.metric("Titik Sumber", points_display)
+            with col_c:
+                st.metric("Severity", _SEVERITY_ICONS.get(result["severity"], "⚪"))
+            
+            if result["diagnosis"] != "Normal":
+                st.info(get_mechanical_recommendation(result["diagnosis"], points_display, result["severity"]))
+                
+                st.subheader("📋 Diagnosis Per Titik")
+                point_df_data = []
+                for point, diag in result.get("point_diagnoses", {}).items():
+                    point_df_data.append({
+                        "Titik": point,
+                        "Velocity (mm/s)": diag.get("velocity", 0),
+                        "Fault Type": diag.get("fault_type", "normal"),
+                        "Severity": diag.get("severity", "Low")
+                    })
+                point_df = pd.DataFrame(point_df_data)
+                st.dataframe(point_df, use_container_width=True)
+    
+    # TAB 2: HYDRAULIC
+    with tab_hyd:
+        st.header("💧 Hydraulic Troubleshooting")
+        st.caption("Single-Point Steady-State Measurement")
+        
+        _hyd_input_fragment(fluid_type, fluid_props)
+        
+        if status["hyd"]:
+            result = st.session_state.hyd_result
+            col_a, col_b, col_c = st.columns(3)
+            with col_a:
+                st.metric("Diagnosis", result["diagnosis"])
+            with col_b:
+                st.metric("Severity", _SEVERITY_ICONS.get(result["severity"], "⚪"))
+            with col_c:
+                st.metric("Domain", "Hydraulic")
+            
+            if result["diagnosis"] != "NORMAL_OPERATION":
+                st.info(get_hydraulic_recommendation(result["diagnosis"], fluid_type, result["severity"]))
+    
+    # TAB 3: ELECTRICAL
+    with tab_elec:
+        st.header("⚡ Electrical Condition Analysis")
+        st.caption("3-Phase Voltage/Current | Unbalance Detection")
+        
+        _elec_input_fragment()
+        
+        if status["elec"]:
             result = st.session_state.elec_result
             col_a, col_b, col_c = st.columns(3)
             with col_a:
                 st.metric("Diagnosis", result["diagnosis"])
             with col_b:
-                st.metric("Severity", {"Low":"🟢","Medium":"🟠","High":"🔴"}.get(result["severity"],"⚪"))
+                st.metric("Severity", _SEVERITY_ICONS.get(result["severity"], "⚪"))
             with col_c:
                 st.metric("Domain", "Electrical")
             
@@ -1359,11 +2119,7 @@ def main():
         st.header("🔗 Integrated Diagnostic Summary")
         st.caption("Cross-Domain Correlation | Temperature Analysis | Multi-Point Support")
         
-        analyses_complete = all([
-            "mech_result" in st.session_state,
-            "hyd_result" in st.session_state,
-            "elec_result" in st.session_state
-        ])
+        analyses_complete = all(status[k] for k in ("mech", "hyd", "elec"))
         
         if not analyses_complete:
             st.info("""
@@ -1376,155 +2132,141 @@ def main():
             
             col1, col2, col3 = st.columns(3)
             with col1:
-                status_mech = "✅" if "mech_result" in st.session_state else "⏳"
+                status_mech = "✅" if status["mech"] else "⏳"
                 st.metric("Mechanical", status_mech)
             with col2:
-                status_hyd = "✅" if "hyd_result" in st.session_state else "⏳"
+                status_hyd = "✅" if status["hyd"] else "⏳"
                 st.metric("Hydraulic", status_hyd)
             with col3:
-                status_elec = "✅" if "elec_result" in st.session_state else "⏳"
+                status_elec = "✅" if status["elec"] else "⏳"
                 st.metric("Electrical", status_elec)
         else:
-            with st.spinner("Mengintegrasikan hasil tiga domain..."):
-                temp_data = st.session_state.get("temp_data", None)
-                integrated_result = aggregate_cross_domain_diagnosis(
-                    st.session_state.mech_result,
-                    st.session_state.hyd_result,
-                    st.session_state.elec_result,
-                    st.session_state.shared_context,
-                    temp_data
-                )
-                st.session_state.integrated_result = integrated_result
+            temp_data = st.session_state.get("temp_data", None)
+            mech_res, hyd_res, elec_res = (
+                st.session_state.get(k)
+                for k in ("mech_result", "hyd_result", "elec_result")
+            )
+            # Agregasi lintas-domain hanya berjalan saat diminta, bukan pada
+            # setiap rerun begitu ketiga domain lengkap.
+            if st.button("🔗 Compute Integrated Diagnosis", type="primary",
+                         key="run_integrated"):
+                with st.spinner("Mengintegrasikan hasil tiga domain..."):
+                    st.session_state.integrated_result = _cached_aggregate(
+                        mech_res, hyd_res, elec_res,
+                        st.session_state.shared_context,
+                        temp_data
+                    )
+                    st.session_state._status["integrated"] = True
             
-            st.subheader("📊 Overall Assessment")
-            col1, col2 = st.columns([2, 1])
+            if status["integrated"]:
+                integrated_result = st.session_state.integrated_result
+                st.subheader("📊 Overall Assessment")
+                col1, col2 = st.columns([2, 1])
             
-            with col1:
-                st.markdown(f"""
-                <div style="background-color:#f0f2f6; padding:15px; border-radius:8px; border-left:5px solid #1E3A5F">
-                <h4 style="margin:0 0 10px 0; color:#1E3A5F">🔗 Integrated Diagnosis</h4>
-                <p style="margin:0; font-size:1.1em; font-weight:600; color:#2c3e50;">
-                {integrated_result["diagnosis"]}
-                </p>
-                </div>
-                """, unsafe_allow_html=True)
+                with col1:
+                    st.markdown(f"""
+                    <div style="background-color:#f0f2f6; padding:15px; border-radius:8px; border-left:5px solid #1E3A5F">
+                    <h4 style="margin:0 0 10px 0; color:#1E3A5F">🔗 Integrated Diagnosis</h4>
+                    <p style="margin:0; font-size:1.1em; font-weight:600; color:#2c3e50;">
+                    {integrated_result.diagnosis}
+                    </p>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with col2:
-                severity_config = {
-                    "Low": ("🟢", "#27ae60"),
-                    "Medium": ("🟠", "#f39c12"),
-                    "High": ("🔴", "#c0392b")
-                }
-                sev_icon, sev_color = severity_config.get(integrated_result["severity"], ("⚪", "#95a5a6"))
-                st.markdown(f"""
-                <div style="background-color:#f0f2f6; padding:15px; border-radius:8px; border-left:5px solid {sev_color}">
-                <h4 style="margin:0 0 10px 0; color:#1E3A5F">⚠️ Overall Severity</h4>
-                <p style="margin:0; font-size:1.5em; font-weight:700; color:{sev_color};">
-                {sev_icon} {integrated_result["severity"]}
-                </p>
-                </div>
-                """, unsafe_allow_html=True)
+                with col2:
+                    st.markdown(_SEV_CARD_HTML.get(integrated_result.severity,
+                                                   _SEV_CARD_FALLBACK),
+                                unsafe_allow_html=True)
             
-            col3, col4, col5 = st.columns(3)
-            with col3:
-                st.metric("Confidence", f"{integrated_result['confidence']}%")
-            with col4:
-                correlation_text = "Detected" if integrated_result['correlation_notes'] and integrated_result['correlation_notes'][0] != "Tidak ada korelasi kuat antar domain terdeteksi" else "None"
-                st.metric("Cross-Domain Correlation", correlation_text)
-            with col5:
-                temp_status = "Available" if temp_data else "N/A"
-                st.metric("Temperature Data", temp_status)
+                col3, col4, col5 = st.columns(3)
+                with col3:
+                    st.metric("Confidence", f"{integrated_result.confidence}%")
+                with col4:
+                    correlation_text = "Detected" if integrated_result.correlation_notes and integrated_result.correlation_notes[0] != "Tidak ada korelasi kuat antar domain terdeteksi" else "None"
+                    st.metric("Cross-Domain Correlation", correlation_text)
+                with col5:
+                    temp_status = "Available" if temp_data else "N/A"
+                    st.metric("Temperature Data", temp_status)
             
-            affected_points = integrated_result.get("affected_points", [])
-            if affected_points and affected_points != ["Tidak Ada (Normal)"]:
-                st.warning(f"📍 **Titik Terpengaruh:** {', '.join(affected_points)}")
+                affected_points = integrated_result.affected_points
+                if affected_points and affected_points != ["Tidak Ada (Normal)"]:
+                    st.warning(f"📍 **Titik Terpengaruh:** {', '.join(affected_points)}")
             
-            # ========================================================================
-            # 🔥 FAULT PROPAGATION MAP DISPLAY (NEW UI ELEMENT)
-            # ========================================================================
-            st.divider()
-            st.subheader("🗺️ Fault Propagation Map untuk Perbaikan")
-            st.caption("Rantai fault dari root cause ke effect + action perbaikan yang diperlukan")
+                # ========================================================================
+                # 🔥 FAULT PROPAGATION MAP DISPLAY (NEW UI ELEMENT)
+                # ========================================================================
+                st.divider()
+                st.subheader("🗺️ Fault Propagation Map untuk Perbaikan")
+                st.caption("Rantai fault dari root cause ke effect + action perbaikan yang diperlukan")
             
-            propagation_map = generate_fault_propagation_map(
-                st.session_state.mech_result,
-                st.session_state.hyd_result,
-                st.session_state.elec_result,
-                temp_data
-            )
+                propagation_map = generate_fault_propagation_map(
+                    mech_res, hyd_res, elec_res, temp_data
+                )
             
-            for idx, prop in enumerate(propagation_map, 1):
-                priority_colors = {
-                    "CRITICAL": ("🔴", "#c0392b"),
-                    "HIGH": ("🟠", "#e67e22"),
-                    "MEDIUM": ("🟡", "#f1c40f"),
-                    "LOW": ("🟢", "#27ae60")
-                }
-                priority_icon, priority_color = priority_colors.get(prop["priority"], ("⚪", "#95a5a6"))
+                for idx, prop in enumerate(propagation_map, 1):
+                    priority_icon, priority_color = _PRIORITY_COLORS.get(prop["priority"], ("⚪", "#95a5a6"))
                 
-                with st.container():
-                    st.markdown(f"""
-                    <div style="background-color:#f8f9fa; padding:15px; border-radius:8px; 
-                                border-left:5px solid {priority_color}; margin:10px 0;">
-                    <h4 style="margin:0 0 10px 0; color:#1E3A5F;">
-                    {priority_icon} Scenario {idx}: {prop["root_cause"]}
-                    </h4>
-                    <p style="margin:5px 0; color:#666;">
-                    <b>Priority:</b> {prop["priority"]} | <b>Timeline:</b> {prop["timeline"]}
-                    </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    with st.container():
+                        st.markdown(f"""
+                        <div style="background-color:#f8f9fa; padding:15px; border-radius:8px; 
+                                    border-left:5px solid {priority_color}; margin:10px 0;">
+                        <h4 style="margin:0 0 10px 0; color:#1E3A5F;">
+                        {priority_icon} Scenario {idx}: {prop["root_cause"]}
+                        </h4>
+                        <p style="margin:5px 0; color:#666;">
+                        <b>Priority:</b> {prop["priority"]} | <b>Timeline:</b> {prop["timeline"]}
+                        </p>
+                        </div>
+                        """, unsafe_allow_html=True)
                     
-                    st.markdown("**🔗 Fault Chain:**")
-                    chain_cols = st.columns(len(prop["fault_chain"]))
-                    for i, fault in enumerate(prop["fault_chain"]):
-                        with chain_cols[i]:
-                            st.markdown(f"""
-                            <div style="background-color:#e8f4f8; padding:10px; border-radius:5px; 
-                                        text-align:center; margin:5px 0;">
-                            <span style="font-size:0.9em;">{fault}</span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            if i < len(prop["fault_chain"]) - 1:
-                                st.markdown("<div style='text-align:center; color:#999;'>↓</div>", unsafe_allow_html=True)
+                        st.markdown("**🔗 Fault Chain:**")
+                        chain_cols = st.columns(len(prop["fault_chain"]))
+                        for i, fault in enumerate(prop["fault_chain"]):
+                            with chain_cols[i]:
+                                st.markdown(f"""
+                                <div style="background-color:#e8f4f8; padding:10px; border-radius:5px; 
+                                            text-align:center; margin:5px 0;">
+                                <span style="font-size:0.9em;">{fault}</span>
+                                </div>
+                                """, unsafe_allow_html=True)
+                                if i < len(prop["fault_chain"]) - 1:
+                                    st.markdown("<div style='text-align:center; color:#999;'>↓</div>", unsafe_allow_html=True)
                     
-                    st.markdown("**🔧 Repair Actions:**")
-                    for action in prop["repair_actions"]:
-                        st.markdown(f"- {action}")
+                        st.markdown("**🔧 Repair Actions:**")
+                        for action in prop["repair_actions"]:
+                            st.markdown(f"- {action}")
                     
-                    st.divider()
-            # ========================================================================
+                        st.divider()
+                # ========================================================================
             
-            st.divider()
-            st.subheader("📥 Export Report")
+                st.divider()
+                st.subheader("📥 Export Report")
             
-            if st.button("📊 Generate Unified CSV Report", type="primary"):
-                csv_report = generate_unified_csv_report(
-                    machine_id,
-                    rpm,
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    st.session_state.get("mech_data", {}),
-                    st.session_state.get("hyd_data", {}),
-                    st.session_state.get("elec_data", {}),
-                    integrated_result,
-                    temp_data
-                )
-                st.download_button(
-                    label="📥 Download CSV Report",
-                    data=csv_report,
-                    file_name=f"PUMP_DIAG_{machine_id}_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
-                st.success("✅ Report generated successfully!")
+                if st.button("📊 Generate Unified CSV Report", type="primary"):
+                    # Satu pembacaan jam per klik: dipakai untuk timestamp
+                    # laporan sekaligus nama file.
+                    now = datetime.now()
+                    csv_report = _cached_csv_report(
+                        machine_id,
+                        rpm,
+                        now.strftime("%Y-%m-%d %H:%M:%S"),
+                        st.session_state.get("mech_data", {}),
+                        st.session_state.get("hyd_data", {}),
+                        st.session_state.get("elec_data", {}),
+                        integrated_result,
+                        temp_data
+                    )
+                    st.download_button(
+                        label="📥 Download CSV Report",
+                        data=csv_report,
+                        file_name=f"PUMP_DIAG_{machine_id}_{now.strftime('%Y%m%d_%H%M')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+                    st.success("✅ Report generated successfully!")
             
-            st.divider()
-            st.caption("""
-            **Standar Acuan**: ISO 10816-3/7 | ISO 13373-1 | API 610 | IEC 60034 | API 670
-            **Algoritma**: Hybrid rule-based dengan cross-domain correlation + confidence scoring
-            ⚠️ Decision Support System - Verifikasi oleh personnel kompeten untuk keputusan kritis
-            🏭 Pertamina Patra Niaga - Asset Integrity Management
-            """)
+                st.divider()
+                st.caption(_FOOTER_CAPTION)
 
 if __name__ == "__main__":
     main()
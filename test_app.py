@@ -0,0 +1,64 @@
+# ============================================================================
+# PENGUJIAN ALUR STREAMLIT END-TO-END
+# ============================================================================
+# Menjalankan app lewat streamlit.testing.v1.AppTest: submit ketiga form
+# domain, klik tombol integrasi, lalu ulangi lintas batas rerun. Fokusnya
+# memastikan payload yang hidup di session_state (termasuk nilai balik
+# _cached_aggregate yang di-pickle st.cache_data) tetap bisa diserialisasi
+# setelah script dieksekusi ulang dan kelas enum didefinisikan ulang.
+from streamlit.testing.v1 import AppTest
+
+
+def _click(at, label):
+    for button in at.button:
+        if button.label == label:
+            button.click()
+            at.run()
+            return
+    raise AssertionError(f"tombol tidak ditemukan: {label}")
+
+
+def _run_all_domains(at):
+    _click(at, "🔍 Jalankan Mechanical Analysis")
+    _click(at, "💧 Generate Diagnosis")
+    _click(at, "⚡ Generate Electrical Diagnosis")
+
+
+def test_integrated_flow_across_reruns():
+    at = AppTest.from_file("app.py", default_timeout=60)
+    at.run()
+    assert not at.exception
+
+    _run_all_domains(at)
+    assert not at.exception
+    status = at.session_state["_status"]
+    assert status["mech"] and status["hyd"] and status["elec"]
+
+    # Klik pertama: agregasi berjalan dan hasilnya (SystemResult berisi
+    # dict domain dari session_state) harus lolos pickling st.cache_data.
+    _click(at, "🔗 Compute Integrated Diagnosis")
+    assert not at.exception
+    assert at.session_state["_status"]["integrated"]
+    result = at.session_state["integrated_result"]
+    assert result.severity in ("Low", "Medium", "High")
+    assert 0 <= result.confidence <= 95
+
+    # Klik kedua setelah rerun penuh: jalur cache (hash argumen + pickle
+    # nilai balik) dilewati lagi dengan payload dari run sebelumnya.
+    _click(at, "🔗 Compute Integrated Diagnosis")
+    assert not at.exception
+    assert at.session_state["integrated_result"].diagnosis == result.diagnosis
+
+
+def test_domain_rerun_invalidates_integrated_result():
+    at = AppTest.from_file("app.py", default_timeout=60)
+    at.run()
+    _run_all_domains(at)
+    _click(at, "🔗 Compute Integrated Diagnosis")
+    assert at.session_state["_status"]["integrated"]
+
+    # Submit ulang satu domain: diagnosa terintegrasi lama harus basi.
+    _click(at, "🔍 Jalankan Mechanical Analysis")
+    assert not at.exception
+    assert not at.session_state["_status"]["integrated"]
+    assert "integrated_result" not in at.session_state